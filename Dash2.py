@@ -1,42 +1,107 @@
+import os
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-import seaborn as sns
-import matplotlib.pyplot as plt
+from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
+from defi_data import load_frames, load_indexes, volume_surface, NEBULA_METRICS
+from animation_frames import cumulative_frames
+from aggregation import MAX_BARS, bucket_to_budget, downsample, histogram, lttb_indices, point_budget, sample_rows
+from defi_stream import RingBuffer, SimulatedSource, StreamFormatError, TailFileSource, STREAM_COLUMNS
+import profiling
+from figure_payload import plotly_chart
 
 st.set_page_config(layout="wide")
+prof = profiling.start("Dash2")
 st.title("DeFi Pulse Explorer")
 st.markdown("Dive into decentralized trading dynamics.")
 
+# DEFI_PERIODS/DEFI_FREQ scale the synthetic data, e.g. for benchmarks.
+PERIODS = int(os.environ.get("DEFI_PERIODS", 30))
+FREQ = os.environ.get("DEFI_FREQ", "D")
+
+frames_data = load_frames(seed=42, periods=PERIODS, freq=FREQ)
+df = frames_data["pipeline"]
+df_defi = frames_data["defi"]
+df_truck = frames_data["truck"]
+indexes = load_indexes(seed=42, periods=PERIODS, freq=FREQ)
+trucks = indexes["truck"]
+pools = indexes["pool"]
+yield_types = indexes["yield_type"]
+
+
+def histogram_figure(data, column, nbins, title, color):
+    # Binned here so only nbins bars go to the browser, whatever the row count.
+    centers, counts, widths = histogram(data[column], nbins)
+    fig = go.Figure(go.Bar(x=centers, y=counts, width=widths, marker_color=color, name=column))
+    fig.update_layout(title=title, xaxis_title=column, yaxis_title="count", bargap=0)
+    return fig
+
+
+def live_feed_panel(capacity, tail_path):
+    # The source, buffer and figure live in session state; a tick only reads
+    # new points, appends them to the ring buffer and repoints the traces.
+    # st.plotly_chart can only resend the whole figure, so each trace is
+    # thinned to point_budget() points: a tick sends at most 3 x 3,000 points
+    # whatever "Points kept" is.
+    state = st.session_state
+    if state.get("live_config") != (capacity, tail_path):
+        state.live_config = (capacity, tail_path)
+        state.live_source = TailFileSource(tail_path) if tail_path else SimulatedSource()
+        state.live_buffer = RingBuffer(capacity, STREAM_COLUMNS)
+        fig = make_subplots(rows=len(STREAM_COLUMNS), cols=1, shared_xaxes=True,
+                            subplot_titles=STREAM_COLUMNS, vertical_spacing=0.08)
+        for i, (name, color) in enumerate(zip(STREAM_COLUMNS, ["mistyrose", "#7209b7", "#00b4d8"])):
+            fig.add_trace(go.Scatter(x=[], y=[], mode="lines", name=name, line_color=color), row=i + 1, col=1)
+        fig.update_layout(template="plotly_dark", height=600, showlegend=False, margin=dict(l=0, r=0, t=40, b=0))
+        state.live_fig = fig
+
+    try:
+        times, rows = state.live_source.read(max_rows=capacity)
+    except StreamFormatError as e:
+        st.error(f"Cannot tail this file: {e}. It needs a header with Date and {', '.join(STREAM_COLUMNS)}.")
+        return
+    if len(times):
+        state.live_buffer.append(times, rows)
+        times, values = state.live_buffer.view()
+        budget = point_budget()
+        with state.live_fig.batch_update():
+            for i, trace in enumerate(state.live_fig.data):
+                keep = lttb_indices(times, values[:, i], budget)
+                trace.x = times[keep]
+                trace.y = values[keep, i]
+    plotly_chart(state.live_fig, use_container_width=True)
+
+
+if st.sidebar.toggle("Live feed", key="live_feed"):
+    refresh = st.sidebar.slider("Refresh every (seconds)", 0.5, 10.0, 2.0, 0.5, key="live_refresh")
+    capacity = st.sidebar.number_input("Points kept", 100, 100_000, 1_000, step=100, key="live_capacity")
+    tail_path = st.sidebar.text_input("Tail CSV file (blank for simulated feed)",
+                                      os.environ.get("DEFI_STREAM_FILE", ""), key="live_file")
+    st.subheader("Live Feed")
+    st.fragment(run_every=refresh)(live_feed_panel)(int(capacity), tail_path.strip())
+    st.markdown("---")
+
+
 st.subheader("Blockchain Pipeline Pressure")
 
-np.random.seed(42)
-dates = pd.date_range("2025-03-01", periods=30, freq="D")
-df = pd.DataFrame({
-    "Date": dates,
-    "ETH_Gas_Cost": np.random.uniform(1.2, 4, 30),  
-    "BTC_Mempool_Size_MB": np.random.uniform(50, 150, 30),  
-    "Pipeline_Latency_Sec": np.random.uniform(0.5, 2.0, 30)  
-})
-df["Day"] = df.index + 1
+pressure_cols = ["ETH_Gas_Cost", "BTC_Mempool_Size_MB", "Pipeline_Latency_Sec"]
+bars = bucket_to_budget(df, "Date", pressure_cols)
+prof.mark("data")
 
 fig = go.Figure()
 
-fig.add_trace(go.Bar(x=df["Date"], y=df["ETH_Gas_Cost"], 
+fig.add_trace(go.Bar(x=bars["Date"], y=bars["ETH_Gas_Cost"], 
                      name="ETH Gas Cost", marker_color="mistyrose"))
-fig.add_trace(go.Bar(x=df["Date"], y=df["BTC_Mempool_Size_MB"], 
+fig.add_trace(go.Bar(x=bars["Date"], y=bars["BTC_Mempool_Size_MB"], 
                      name="BTC Mempool Size", marker_color="#7209b7"))
-fig.add_trace(go.Bar(x=df["Date"], y=df["Pipeline_Latency_Sec"], 
+fig.add_trace(go.Bar(x=bars["Date"], y=bars["Pipeline_Latency_Sec"], 
                      name="Pipeline Latency", marker_color="#f72585"))
 
-frames = [go.Frame(data=[
-    go.Bar(x=df["Date"], y=df["ETH_Gas_Cost"][:k+1]),
-    go.Bar(x=df["Date"], y=df["BTC_Mempool_Size_MB"][:k+1]),
-    go.Bar(x=df["Date"], y=df["Pipeline_Latency_Sec"][:k+1])
-]) for k in range(len(df))]
-fig.frames = frames
+pressure = bars[pressure_cols].to_numpy().T
+# At most MAX_BARS bars, so no frame is thinned and y alone lines up with the base x.
+fig.frames = cumulative_frames(len(bars), lambda i: [go.Bar(y=row[i]) for row in pressure], traces=[0, 1, 2])
 
 fig.update_layout(
     template="plotly_dark",
@@ -47,66 +112,41 @@ fig.update_layout(
     margin=dict(l=0, r=0, t=50, b=0),
     legend=dict(x=0.9, y=0.99, bgcolor="rgba(0,0,0,0)")
 )
-st.plotly_chart(fig, use_container_width=True)
+plotly_chart(fig, use_container_width=True)
 
 st.markdown("---")
 
-
-
-np.random.seed(42)
-dates = pd.date_range("2025-03-01", periods=30, freq="D")
-df_defi = pd.DataFrame({
-    "Date": dates,
-    "Swap_Volume_USD": np.random.uniform(50000, 150000, 30),
-    "Liquidity_USD": np.random.uniform(200000, 500000, 30),
-    "Gas_Cost_ETH": np.random.uniform(0.01, 0.05, 30),
-    "Active_Users": np.random.randint(50, 200, 30),
-    "Yield_APR": np.random.uniform(5, 25, 30) + np.random.randn(30) * 5,
-    "Whale_Trades": np.random.poisson(5, 30),
-    "Pool": np.random.choice(["ZAP/ETH", "ZAP/USDC"], 30)
-})
-df_defi["Yield_Type"] = np.random.choice(["Staking", "Farming", "Lending"], len(df_defi))
-df_defi["APR_Size"] = df_defi["Yield_APR"].abs()
-df_defi["Day"] = df_defi.index + 1
-
-df_truck = pd.DataFrame({
-    "Date": dates,
-    "ETH_Gas_Cost": np.random.uniform(0.02, 0.08, 30),
-    "BTC_Tx_Fee": np.random.uniform(0.0005, 0.002, 30),
-    "Haul_Value_USD": np.random.uniform(10000, 50000, 30),
-    "Driver_Payout_ETH": np.random.uniform(0.1, 0.5, 30),
-    "Truck_ID": np.random.choice(["Truck_A", "Truck_B", "Truck_C"], 30),
-    "ETH_Price_USD": 3000 + np.random.randn(30) * 100,
-    "BTC_Price_USD": 60000 + np.random.randn(30) * 2000,
-    "ETH_Wallet_Count": np.random.randint(20, 100, 30),
-    "BTC_Mempool_Size_MB": np.random.uniform(50, 150, 30)
-})
-df_truck["Day"] = df_truck.index + 1
-
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Yield Farming Breakdown")
     st.markdown("Tip: Click on Farming") 
-    filtered_df = df_defi 
+    # One leaf per bucket of dates, MAX_BARS leaves in all: APR sizes add up, the APR colour is averaged.
+    breakdown = df_defi.groupby(["Pool", "Yield_Type"])
+    filtered_df = pd.concat([
+        bucket_to_budget(group, "Date", ["APR_Size", "Yield_APR"], max(MAX_BARS // breakdown.ngroups, 2),
+                         agg={"APR_Size": "sum", "Yield_APR": "mean"}).assign(Pool=pool, Yield_Type=kind)
+        for (pool, kind), group in breakdown])
+    filtered_df = filtered_df[filtered_df["APR_Size"] > 0]
+    prof.mark("data")
     fig1 = px.sunburst(filtered_df, path=["Pool", "Yield_Type", "Date"], values="APR_Size",
                        color="Yield_APR", color_continuous_scale="Viridis_r",
                        title=" ")
     fig1.update_layout(template="plotly_dark", title_x=0.5, margin=dict(t=50, l=0, r=0, b=0))
-    st.plotly_chart(fig1, use_container_width=True)
+    plotly_chart(fig1, use_container_width=True)
 
 with col2:
     st.subheader("Gas vs. Trading Metrics")
-    fig2 = px.parallel_coordinates(df_defi, color="Gas_Cost_ETH",
+    fig2 = px.parallel_coordinates(sample_rows(df_defi), color="Gas_Cost_ETH",
                                    dimensions=["Swap_Volume_USD", "Liquidity_USD", "Active_Users", "Gas_Cost_ETH"],
                                    color_continuous_scale="Plasma",
                                    title=" ")
     fig2.update_layout(template="plotly_dark", title_x=0.5)
-    st.plotly_chart(fig2, use_container_width=True)
+    plotly_chart(fig2, use_container_width=True)
 
 st.subheader("Swap Volume VS Liquidity")
-df_defi["Day"] = df.index + 1 
-filtered_df = df_defi
+filtered_df = downsample(df_defi, "Date", ["Swap_Volume_USD", "Liquidity_USD"], point_budget())
+prof.mark("data")
     
 fig = go.Figure()
 fig.add_trace(go.Scatter(x=filtered_df["Date"], y=filtered_df["Swap_Volume_USD"], 
@@ -114,13 +154,13 @@ fig.add_trace(go.Scatter(x=filtered_df["Date"], y=filtered_df["Swap_Volume_USD"]
 fig.add_trace(go.Scatter(x=filtered_df["Date"], y=filtered_df["Liquidity_USD"], 
                              fill="tozeroy", name="Liquidity ($)", mode="lines", opacity=0.5))
     
-frames = [go.Frame(data=[
-        go.Scatter(x=filtered_df["Date"][:k], y=filtered_df["Swap_Volume_USD"][:k], fill="tozeroy"),
-        go.Scatter(x=filtered_df["Date"][:k], y=filtered_df["Liquidity_USD"][:k], fill="tozeroy")
-        ]) for k in range(1, len(filtered_df)+1)]
+swap_dates = filtered_df["Date"].to_numpy()
+swap_values = filtered_df[["Swap_Volume_USD", "Liquidity_USD"]].to_numpy().T
 fig.update_layout(title=" ", title_x=0.4, height=500)
-fig.frames = frames
-st.plotly_chart(fig)
+fig.frames = cumulative_frames(len(filtered_df), lambda i: [
+        go.Scatter(x=swap_dates[i], y=row[i]) for row in swap_values], traces=[0, 1],
+        x=swap_dates, y=swap_values[0])
+plotly_chart(fig)
         
 
 col3, col4 = st.columns(2)
@@ -128,130 +168,172 @@ col3, col4 = st.columns(2)
 with col3:
         
     st.subheader("Whale Trade Distribution")
-    filtered_df = df_defi
+    filtered_df = sample_rows(df_defi)
     fig = px.violin(filtered_df, x="Pool", y="Whale_Trades", color="Pool",
                     color_discrete_sequence=["gold", "magenta"],
                     template="plotly_dark",)
     
     fig.update_xaxes(tickfont=dict(color="white"))
     fig.update_yaxes(title='Whale Trades (in Million $)',tickfont=dict(color="white"))
-    st.plotly_chart(fig)
+    plotly_chart(fig)
 
 
 
 with col4:
     st.subheader("Traging Dynamics")
-    filtered_df = df_defi 
+    filtered_df = sample_rows(df_defi)
     fig222 = px.scatter_3d(filtered_df, x="Swap_Volume_USD", y="Gas_Cost_ETH", z="Date",
                         size="Active_Users", color="Pool", title="Trading Dynamics (3D)", color_discrete_sequence=['cyan','magenta'],
                         labels={"Swap_Volume_USD": "Volume ($)", "Gas_Cost_ETH": "Gas (ETH)", "Active_Users": "Users"})
     fig222.update_traces(marker=dict(opacity=0.7))
-    st.plotly_chart(fig222)
+    plotly_chart(fig222)
 
+# Every widget below drives a single chart, so each panel is a fragment:
+# changing its selectbox or button reruns only that panel, not the page.
 col5, col6 = st.columns(2)
 
-with col5:
+@st.fragment
+def swap_volume_panel():
     st.subheader("Swap Volume by Pool")
     pool_swap = st.selectbox("Select Pool for Volume", ["ZAP/ETH", "ZAP/USDC"])
-    filtered_swap = df_defi[df_defi["Pool"] == pool_swap]
+    filtered_swap = bucket_to_budget(pools[pool_swap], "Date", ["Swap_Volume_USD"])
+    prof.mark("data")
     fig5 = px.bar(filtered_swap, x="Date", y="Swap_Volume_USD", 
                   title="Swap Volume by Pool", color_discrete_sequence=["#00b4d8"])
     fig5.update_layout(template="plotly_dark", title_x=0.4, showlegend=False)
-    st.plotly_chart(fig5, use_container_width=True)
+    plotly_chart(fig5, use_container_width=True)
 
-with col6:
+with col5:
+    swap_volume_panel()
+
+@st.fragment
+def yield_apr_panel():
     st.subheader("Yield APR Distribution")
     yield_type = st.selectbox("Select Yield Type", ["Staking", "Farming", "Lending"])
-    filtered_yield = df_defi[df_defi["Yield_Type"] == yield_type]
-    fig6 = px.histogram(filtered_yield, x="Yield_APR", nbins=20, 
-                        title="Yield APR Distribution", color_discrete_sequence=["#7209b7"])
+    filtered_yield = yield_types[yield_type]
+    prof.mark("data")
+    fig6 = histogram_figure(filtered_yield, "Yield_APR", 20, "Yield APR Distribution", "#7209b7")
     fig6.update_layout(template="plotly_dark", title_x=0.4, showlegend=False)
-    st.plotly_chart(fig6, use_container_width=True)
+    plotly_chart(fig6, use_container_width=True)
+
+with col6:
+    yield_apr_panel()
 
 col7, col8 = st.columns(2)
 
-with col7:
+@st.fragment
+def user_bars_panel():
     st.subheader("Active Users vs. Whale Trades")
     play_bar = st.button("Animate User Bars")
+    user_bars = bucket_to_budget(df_defi, "Date", ["Active_Users", "Whale_Trades"])
+    prof.mark("data")
     fig7 = go.Figure(data=[
-        go.Bar(x=df_defi["Date"], y=df_defi["Active_Users"], name="Active Users", marker_color="#00b4d8"),
-        go.Bar(x=df_defi["Date"], y=df_defi["Whale_Trades"] * 10, name="Whale Trades (x10)", marker_color="#f72585")
+        go.Bar(x=user_bars["Date"], y=user_bars["Active_Users"], name="Active Users", marker_color="#00b4d8"),
+        go.Bar(x=user_bars["Date"], y=user_bars["Whale_Trades"] * 10, name="Whale Trades (x10)", marker_color="#f72585")
     ])
     if play_bar:
         frames = [go.Frame(data=[
-            go.Bar(x=df_defi["Date"], y=df_defi["Active_Users"] * (k/5)),
-            go.Bar(x=df_defi["Date"], y=df_defi["Whale_Trades"] * 10 * (k/5))
-        ]) for k in range(1, 6)]
+            go.Bar(y=user_bars["Active_Users"] * (k/5)),
+            go.Bar(y=user_bars["Whale_Trades"] * 10 * (k/5))
+        ], traces=[0, 1]) for k in range(1, 6)]
         fig7.frames = frames
         fig7.update_layout(updatemenus=[dict(type="buttons", buttons=[dict(label="Play",
                               method="animate", args=[None, {"frame": {"duration": 500}}])])])
     fig7.update_layout(template="plotly_dark", barmode="group")
-    st.plotly_chart(fig7, use_container_width=True)
+    plotly_chart(fig7, use_container_width=True)
 
-with col8:
+with col7:
+    user_bars_panel()
+
+@st.fragment
+def pool_gas_panel():
     st.subheader("Gas Cost Spread")
     gas_pool = st.selectbox("Select Pool for Gas", ["ZAP/ETH", "ZAP/USDC"])
-    filtered_gas = df_defi[df_defi["Pool"] == gas_pool]
-    fig8 = px.histogram(filtered_gas, x="Gas_Cost_ETH", nbins=15, 
-                        title="Gas Cost Spread", color_discrete_sequence=["#f72585"])
+    filtered_gas = pools[gas_pool]
+    prof.mark("data")
+    fig8 = histogram_figure(filtered_gas, "Gas_Cost_ETH", 15, "Gas Cost Spread", "#f72585")
     fig8.update_layout(template="plotly_dark", title_x=0.42, showlegend=False)
-    st.plotly_chart(fig8, use_container_width=True)
+    plotly_chart(fig8, use_container_width=True)
+
+with col8:
+    pool_gas_panel()
 
 col9, col10 = st.columns(2)
 
-with col9:
+@st.fragment
+def haul_value_panel():
     st.subheader("Haul Value by Truck (USD)")
-    truck_choice = st.selectbox("Select Truck", df_truck["Truck_ID"].unique())
-    filtered_truck = df_truck[df_truck["Truck_ID"] == truck_choice]
+    truck_choice = st.selectbox("Select Truck", trucks.keys)
+    filtered_truck = bucket_to_budget(trucks[truck_choice], "Date", ["Haul_Value_USD"])
+    prof.mark("data")
     fig9 = px.bar(filtered_truck, x="Date", y="Haul_Value_USD", 
                   title="Haul Value by Truck (USD)", color_discrete_sequence=["#00b4d8"])
     fig9.update_layout(template="plotly_dark", title_x=0.4, showlegend=False)
-    st.plotly_chart(fig9, use_container_width=True)
+    plotly_chart(fig9, use_container_width=True)
 
-with col10:
+with col9:
+    haul_value_panel()
+
+@st.fragment
+def truck_gas_panel():
     st.subheader("ETH Gas Cost Distribution")
-    truck_gas = st.selectbox("Truck for Gas Costs", df_truck["Truck_ID"].unique())
-    filtered_gas = df_truck[df_truck["Truck_ID"] == truck_gas]
-    fig10 = px.histogram(filtered_gas, x="ETH_Gas_Cost", nbins=15, 
-                         title="ETH Gas Cost Distribution", color_discrete_sequence=["#7209b7"])
+    truck_gas = st.selectbox("Truck for Gas Costs", trucks.keys)
+    filtered_gas = trucks[truck_gas]
+    prof.mark("data")
+    fig10 = histogram_figure(filtered_gas, "ETH_Gas_Cost", 15, "ETH Gas Cost Distribution", "#7209b7")
     fig10.update_layout(template="plotly_dark", title_x=0.35, showlegend=False)
-    st.plotly_chart(fig10, use_container_width=True)
+    plotly_chart(fig10, use_container_width=True)
+
+with col10:
+    truck_gas_panel()
 
 col11, col12 = st.columns(2)
 
-with col11:
+@st.fragment
+def fee_comparison_panel():
     st.subheader("ETH Gas vs. BTC Tx Fees")
     play_fees = st.button("Animate Fee Comparison")
+    fee_bars = bucket_to_budget(df_truck, "Date", ["ETH_Gas_Cost", "BTC_Tx_Fee"])
+    prof.mark("data")
     fig11 = go.Figure(data=[
-        go.Bar(x=df_truck["Date"], y=df_truck["ETH_Gas_Cost"], name="ETH Gas", marker_color="#00b4d8"),
-        go.Bar(x=df_truck["Date"], y=df_truck["BTC_Tx_Fee"], name="BTC Tx Fee", marker_color="#f72585")
+        go.Bar(x=fee_bars["Date"], y=fee_bars["ETH_Gas_Cost"], name="ETH Gas", marker_color="#00b4d8"),
+        go.Bar(x=fee_bars["Date"], y=fee_bars["BTC_Tx_Fee"], name="BTC Tx Fee", marker_color="#f72585")
     ])
     if play_fees:
         frames = [go.Frame(data=[
-            go.Bar(x=df_truck["Date"], y=df_truck["ETH_Gas_Cost"] * (k/5)),
-            go.Bar(x=df_truck["Date"], y=df_truck["BTC_Tx_Fee"] * (k/5))
-        ]) for k in range(1, 6)]
+            go.Bar(y=fee_bars["ETH_Gas_Cost"] * (k/5)),
+            go.Bar(y=fee_bars["BTC_Tx_Fee"] * (k/5))
+        ], traces=[0, 1]) for k in range(1, 6)]
         fig11.frames = frames
         fig11.update_layout(updatemenus=[dict(type="buttons", buttons=[dict(label="Play",
                               method="animate", args=[None, {"frame": {"duration": 500}}])])])
     fig11.update_layout(template="plotly_dark", barmode="group")
-    st.plotly_chart(fig11, use_container_width=True)
+    plotly_chart(fig11, use_container_width=True)
 
-with col12:
+with col11:
+    fee_comparison_panel()
+
+@st.fragment
+def payout_panel():
     st.subheader("Driver Payout Spread")
-    truck_payout = st.selectbox("Truck for Payouts", df_truck["Truck_ID"].unique())
-    filtered_payout = df_truck[df_truck["Truck_ID"] == truck_payout]
-    fig12 = px.histogram(filtered_payout, x="Driver_Payout_ETH", nbins=15, 
-                         title="Driver Payout Spread", color_discrete_sequence=["#f72585"])
+    truck_payout = st.selectbox("Truck for Payouts", trucks.keys)
+    filtered_payout = trucks[truck_payout]
+    prof.mark("data")
+    fig12 = histogram_figure(filtered_payout, "Driver_Payout_ETH", 15, "Driver Payout Spread", "#f72585")
     fig12.update_layout(template="plotly_dark", title_x=0.4, showlegend=False)
-    st.plotly_chart(fig12, use_container_width=True)
+    plotly_chart(fig12, use_container_width=True)
+
+with col12:
+    payout_panel()
 
 col13, col14 = st.columns(2)
 
-with col13:
+@st.fragment
+def volatility_panel():
     st.subheader("ETH Price Volatility vs. Haul Value")
-    truck_vol = st.selectbox("Truck for Volatility", df_truck["Truck_ID"].unique())
-    filtered_vol = df_truck[df_truck["Truck_ID"] == truck_vol]
+    truck_vol = st.selectbox("Truck for Volatility", trucks.keys)
+    filtered_vol = bucket_to_budget(trucks[truck_vol], "Date", ["ETH_Price_USD", "Haul_Value_USD"])
+    prof.mark("data")
     fig13 = go.Figure()
     fig13.add_trace(go.Bar(x=filtered_vol["Date"], y=filtered_vol["ETH_Price_USD"], 
                            name="ETH Price (USD)", marker_color="#00b4d8", yaxis="y1"))
@@ -259,91 +341,88 @@ with col13:
                            name="Haul Value (USD)", marker_color="#7209b7", yaxis="y2"))
     fig13.update_layout(template="plotly_dark",
                         yaxis=dict(title="ETH Price"), yaxis2=dict(title="Haul Value", overlaying="y", side="right"))
-    st.plotly_chart(fig13, use_container_width=True)
+    plotly_chart(fig13, use_container_width=True)
 
-with col14:
+with col13:
+    volatility_panel()
+
+@st.fragment
+def btc_fee_panel():
     st.subheader("BTC Transaction Fee Spread")
-    truck_btc = st.selectbox("Truck for BTC Fees", df_truck["Truck_ID"].unique())
-    filtered_btc = df_truck[df_truck["Truck_ID"] == truck_btc]
-    fig14 = px.histogram(filtered_btc, x="BTC_Tx_Fee", nbins=15, 
-                         title="BTC Transaction Fee Spread", color_discrete_sequence=["#f72585"])
+    truck_btc = st.selectbox("Truck for BTC Fees", trucks.keys)
+    filtered_btc = trucks[truck_btc]
+    prof.mark("data")
+    fig14 = histogram_figure(filtered_btc, "BTC_Tx_Fee", 15, "BTC Transaction Fee Spread", "#f72585")
     fig14.update_layout(template="plotly_dark", title_x=0.4, showlegend=False)
-    st.plotly_chart(fig14, use_container_width=True)
+    plotly_chart(fig14, use_container_width=True)
+
+with col14:
+    btc_fee_panel()
 
 col15, col16 = st.columns(2)
 
-with col15:
+@st.fragment
+def wallet_panel():
     st.subheader("ETH Wallet Activity by Truck")
     play_wallets = st.button("Animate Wallet Activity")
+    wallet_colors = {"Truck_A": "#00b4d8", "Truck_B": "#7209b7", "Truck_C": "#f72585"}
+    wallets = {truck: bucket_to_budget(trucks[truck], "Date", ["ETH_Wallet_Count"]) for truck in wallet_colors}
+    prof.mark("data")
     fig15 = go.Figure(data=[
-        go.Bar(x=df_truck[df_truck["Truck_ID"] == "Truck_A"]["Date"], 
-               y=df_truck[df_truck["Truck_ID"] == "Truck_A"]["ETH_Wallet_Count"], 
-               name="Truck_A", marker_color="#00b4d8"),
-        go.Bar(x=df_truck[df_truck["Truck_ID"] == "Truck_B"]["Date"], 
-               y=df_truck[df_truck["Truck_ID"] == "Truck_B"]["ETH_Wallet_Count"], 
-               name="Truck_B", marker_color="#7209b7"),
-        go.Bar(x=df_truck[df_truck["Truck_ID"] == "Truck_C"]["Date"], 
-               y=df_truck[df_truck["Truck_ID"] == "Truck_C"]["ETH_Wallet_Count"], 
-               name="Truck_C", marker_color="#f72585")
+        go.Bar(x=wallets[truck]["Date"], y=wallets[truck]["ETH_Wallet_Count"],
+               name=truck, marker_color=color)
+        for truck, color in wallet_colors.items()
     ])
     if play_wallets:
         frames = [go.Frame(data=[
-            go.Bar(x=df_truck[df_truck["Truck_ID"] == "Truck_A"]["Date"], 
-                   y=df_truck[df_truck["Truck_ID"] == "Truck_A"]["ETH_Wallet_Count"] * (k/5)),
-            go.Bar(x=df_truck[df_truck["Truck_ID"] == "Truck_B"]["Date"], 
-                   y=df_truck[df_truck["Truck_ID"] == "Truck_B"]["ETH_Wallet_Count"] * (k/5)),
-            go.Bar(x=df_truck[df_truck["Truck_ID"] == "Truck_C"]["Date"], 
-                   y=df_truck[df_truck["Truck_ID"] == "Truck_C"]["ETH_Wallet_Count"] * (k/5))
+            go.Bar(x=wallets[truck]["Date"], y=wallets[truck]["ETH_Wallet_Count"] * (k/5))
+            for truck in wallet_colors
         ]) for k in range(1, 6)]
         fig15.frames = frames
         fig15.update_layout(updatemenus=[dict(type="buttons", buttons=[dict(label="Play",
                               method="animate", args=[None, {"frame": {"duration": 500}}])])])
     fig15.update_layout(template="plotly_dark", barmode="group")
-    st.plotly_chart(fig15, use_container_width=True)
+    plotly_chart(fig15, use_container_width=True)
 
-with col16:
+with col15:
+    wallet_panel()
+
+@st.fragment
+def mempool_panel():
     st.subheader("BTC Mempool Congestion")
-    truck_mempool = st.selectbox("Truck for Mempool", df_truck["Truck_ID"].unique())
-    filtered_mempool = df_truck[df_truck["Truck_ID"] == truck_mempool]
-    fig16 = px.histogram(filtered_mempool, x="BTC_Mempool_Size_MB", nbins=15, 
-                         title="BTC Mempool Congestion", color_discrete_sequence=["#7209b7"])
+    truck_mempool = st.selectbox("Truck for Mempool", trucks.keys)
+    filtered_mempool = trucks[truck_mempool]
+    prof.mark("data")
+    fig16 = histogram_figure(filtered_mempool, "BTC_Mempool_Size_MB", 15, "BTC Mempool Congestion", "#7209b7")
     fig16.update_layout(template="plotly_dark", title_x=0.4, showlegend=False)
-    st.plotly_chart(fig16, use_container_width=True)
+    plotly_chart(fig16, use_container_width=True)
+
+with col16:
+    mempool_panel()
 
 st.title(" Trading Volume ")
-x = np.linspace(0, 10, 50)
-y = np.linspace(0, 10, 50)
-X, Y = np.meshgrid(x, y)
-Z = np.sin(X) * np.cos(Y) * np.random.rand(50, 50) * 100
+X, Y, Z = volume_surface(seed=42)
+prof.mark("data")
 
 fig121 = go.Figure(data=[go.Surface(z=Z, x=X, y=Y, colorscale="Plasma")])
 
 fig121.update_layout(title="DeFi Trading Volume", title_x=0.4,
                   width=900, height=600, template="plotly_dark")
 
-st.plotly_chart(fig121)
+plotly_chart(fig121)
 
 
 st.title("Crypto Nebula Flux")
 st.markdown("A 3D journey through Ethereum and Bitcoin dynamics.")
 
-np.random.seed(42)
-dates = pd.date_range("2025-03-01", periods=30, freq="D")
-metrics = ["ETH_Price", "BTC_Price", "ETH_TVL", "BTC_TVL", "ETH_Volume", "BTC_Volume"]
-df = pd.DataFrame({
-    "Date": dates,
-    "ETH_Price": 3000 + np.random.randn(30) * 100,
-    "BTC_Price": 60000 + np.random.randn(30) * 2000,
-    "ETH_TVL": np.random.uniform(5000000, 15000000, 30),
-    "BTC_TVL": np.random.uniform(2000000, 8000000, 30),
-    "ETH_Volume": np.random.uniform(1000000, 5000000, 30),
-    "BTC_Volume": np.random.uniform(800000, 3000000, 30)
-})
-df["Day"] = df.index + 1
+metrics = NEBULA_METRICS
+# At most MAX_BARS dates: the surface and each of its frames stay the same size however long the data is.
+df_nebula = bucket_to_budget(frames_data["nebula"], "Date", metrics)
 
 x = metrics
-y = dates
-z = df[metrics].values.T
+y = df_nebula["Date"]
+z = df_nebula[metrics].values.T
+prof.mark("data")
 
 fig = go.Figure(data=[go.Surface(
     x=x, y=y, z=z,
@@ -351,8 +430,8 @@ fig = go.Figure(data=[go.Surface(
     showscale=False
 )])
 
-frames = [go.Frame(data=[go.Surface(z=df[metrics].iloc[:k+1].values.T)]) for k in range(len(df))]
-fig.frames = frames
+# Bucketed to fewer dates than FRAME_POINTS, so no frame is thinned and z alone lines up with the base y.
+fig.frames = cumulative_frames(len(df_nebula), lambda i: [go.Surface(z=z[:, i])], traces=[0])
 
 fig.update_layout(
     template="plotly_dark",
@@ -368,7 +447,9 @@ fig.update_layout(
     margin=dict(l=0, r=0, t=50, b=0)
 )
 
-st.plotly_chart(fig, use_container_width=True)
+plotly_chart(fig, use_container_width=True)
 
 st.markdown("---")
 st.subheader("More Insights Coming...")
+
+prof.finish()
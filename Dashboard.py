@@ -3,9 +3,15 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from figure_cache import cached_figure, lazy_expander
+from mpl_render import render
+from dataset_store import get_dataset, get_slice
+from aggregation import downsample, point_budget, rolling_mean
+import profiling
+from figure_payload import plotly_chart
 
 st.set_page_config(layout="wide")
+prof = profiling.start("Dashboard")
 
 st.title("Interactive Dashboard with Plotly")
 
@@ -15,43 +21,56 @@ st.link_button("For The DeFi Data Dashboard CLICK HERE!", "https://vizzardd.stre
 st.subheader("Running Scatter Plot")
 
 
-df = px.data.gapminder()
+@cached_figure
+def gapminder_animation():
+    df = get_dataset("gapminder")
+    fig11 = px.scatter(df, x="gdpPercap", y="lifeExp", animation_frame="year", animation_group="country",
+                     size="pop", color="continent", hover_name="country",
+                     log_x=True, size_max=60, title="GDP vs Life Expectancy Over Time",
+                     template="plotly_dark") 
+    fig11.update_layout(yaxis=dict(range=[30, 100]), height=500)
+    return fig11
 
-fig11 = px.scatter(df, x="gdpPercap", y="lifeExp", animation_frame="year", animation_group="country",
-                 size="pop", color="continent", hover_name="country",
-                 log_x=True, size_max=60, title="GDP vs Life Expectancy Over Time",
-                 template="plotly_dark") 
-fig11.update_layout(yaxis=dict(range=[30, 100]), height=500)
-st.plotly_chart(fig11)
+plotly_chart(gapminder_animation())
 
 st.subheader("Polar Chart - Wind Data")
-df44 = px.data.wind()
-fig1 = px.bar_polar(df44, r="frequency", theta="direction", color="strength",
-                    color_discrete_sequence=px.colors.sequential.Plasma_r,
-                    title="Polar Chart",
-                    template='plotly_dark')
-fig1.update_layout(width=1000, height=800)
-st.plotly_chart(fig1)
+
+@cached_figure
+def wind_polar():
+    df44 = get_dataset("wind")
+    fig1 = px.bar_polar(df44, r="frequency", theta="direction", color="strength",
+                        color_discrete_sequence=px.colors.sequential.Plasma_r,
+                        title="Polar Chart",
+                        template='plotly_dark')
+    fig1.update_layout(width=1000, height=800)
+    return fig1
+
+plotly_chart(wind_polar())
 
 
 st.subheader("US Export of Plastic Scrap")
-years = list(range(1995, 2013))
-fig2 = go.Figure()
-fig2.add_trace(go.Bar(x=years,
-                y=[219, 146, 112, 127, 124, 180, 236, 207, 236, 263, 350, 430, 474, 526, 488, 537, 500, 439],
-                name='Rest of world',
-                marker_color='rgb(55, 83, 109)'))
-fig2.add_trace(go.Bar(x=years,
-                y=[16, 13, 10, 11, 28, 37, 43, 55, 56, 88, 105, 156, 270, 299, 340, 403, 549, 499],
-                name='China',
-                marker_color='rgb(26, 118, 255)'))
-fig2.update_layout(title="US Export of Plastic Scrap",
-                   xaxis_tickfont_size=14,
-                   yaxis=dict(title="USD (millions)", tickfont_size=14),
-                   legend=dict(x=0, y=1.0, bgcolor='rgba(255, 255, 255, 0)', bordercolor='rgba(255, 255, 255, 0)'),
-                   barmode='group', bargap=0.15, bargroupgap=0.1,
-                   height=500, width=1400)
-st.plotly_chart(fig2)
+
+@cached_figure
+def plastic_scrap():
+    years = list(range(1995, 2013))
+    fig2 = go.Figure()
+    fig2.add_trace(go.Bar(x=years,
+                    y=[219, 146, 112, 127, 124, 180, 236, 207, 236, 263, 350, 430, 474, 526, 488, 537, 500, 439],
+                    name='Rest of world',
+                    marker_color='rgb(55, 83, 109)'))
+    fig2.add_trace(go.Bar(x=years,
+                    y=[16, 13, 10, 11, 28, 37, 43, 55, 56, 88, 105, 156, 270, 299, 340, 403, 549, 499],
+                    name='China',
+                    marker_color='rgb(26, 118, 255)'))
+    fig2.update_layout(title="US Export of Plastic Scrap",
+                       xaxis_tickfont_size=14,
+                       yaxis=dict(title="USD (millions)", tickfont_size=14),
+                       legend=dict(x=0, y=1.0, bgcolor='rgba(255, 255, 255, 0)', bordercolor='rgba(255, 255, 255, 0)'),
+                       barmode='group', bargap=0.15, bargroupgap=0.1,
+                       height=500, width=1400)
+    return fig2
+
+plotly_chart(plastic_scrap())
 
 col2, col3 = st.columns(2)
 with col2:
@@ -77,164 +96,221 @@ with col2:
     a3 = pd.DataFrame(a3)
     a3['date'] = pd.to_datetime(a3['date'])
     a3['month'] = a3['date'].dt.month
-    fig8 = px.bar(
-        a3,
-        x='influencer',
-        color='followers',
-        y='followers',
-        animation_frame='month',
-        color_continuous_scale='tropic',
-        width=10,
-        template='plotly_dark'
-    )
-    fig8.update_layout(height=600, width=500, transition = {'duration':1000})
-    st.plotly_chart(fig8)
+
+    @cached_figure
+    def influencer_bars(a3):
+        fig8 = px.bar(
+            a3,
+            x='influencer',
+            color='followers',
+            y='followers',
+            animation_frame='month',
+            color_continuous_scale='tropic',
+            width=10,
+            template='plotly_dark'
+        )
+        fig8.update_layout(height=600, width=500, transition = {'duration':1000})
+        return fig8
+
+    plotly_chart(influencer_bars(a3))
 
 with col3:
     st.subheader("3D wave Motion")
-    t = np.linspace(0, 4*np.pi, 100)
-    x = np.sin(t)
-    y = np.cos(t)
-    z = t
-    
-    fig223 = go.Figure(data=[go.Scatter3d(x=x, y=y, z=z, mode='lines',
-                                       line=dict(width=4, color='cyan'))])
-    
-    fig223.update_layout(title = " ",width=900, height=700, template="plotly_dark", title_x=0.5)
+
+    @cached_figure
+    def wave_3d(points=100):
+        t = np.linspace(0, 4*np.pi, points)
+        x = np.sin(t)
+        y = np.cos(t)
+        z = t
+        
+        fig223 = go.Figure(data=[go.Scatter3d(x=x, y=y, z=z, mode='lines',
+                                           line=dict(width=4, color='cyan'))])
+        
+        fig223.update_layout(title = " ",width=900, height=700, template="plotly_dark", title_x=0.5)
+        return fig223
     
-    st.plotly_chart(fig223)
+    plotly_chart(wave_3d())
 
 
 
 st.subheader("World Population Treemap (2007)")
-df3 = px.data.gapminder().query("year == 2007")
-fig3 = px.treemap(df3, path=[px.Constant("world"), 'continent', 'country'], values='pop',
-                   color='lifeExp', hover_data=['iso_alpha'],
-                   title='Treemap of Population Distribution',
-                   color_continuous_scale='tealrose',
-                   color_continuous_midpoint=np.average(df3['lifeExp'], weights=df3['pop']))
-fig3.update_layout(margin=dict(t=50, l=25, r=25, b=25))
-st.plotly_chart(fig3)
-
-
-st.subheader("Stock Performance Analysis")
-df4 = px.data.stocks(indexed=True, datetimes=True)
-fig4 = px.scatter(df4, trendline="rolling", trendline_options=dict(window=5),
-                  title="Stock Performance")
-fig4.data = [t for t in fig4.data if t.mode == "lines"]
-fig4.update_traces(showlegend=True)
-fig4.update_layout(width=1300, height=500)
-st.plotly_chart(fig4)
-
-
-st.subheader("Customer Satisfaction Across Service Channels")
-data222 = {
-    'ease_of_use': [80, 70, 65],
-    'responsiveness': [75, 85, 90],
-    'quality_of_service': [85, 80, 75],
-    'overall_satisfaction': [78, 83, 82]
-}
-df5 = pd.DataFrame(data222)
-df5['Row'] = ['Online', 'In-Store', 'Phone support']
-df_melted = df5.melt(id_vars='Row', value_vars=df5.columns[:-1], var_name='Category', value_name='Value')
-
-fig5 = px.line_polar(df_melted, r='Value', theta='Category', color='Row', line_close=True, 
-                     template='plotly_dark', markers='X',
-                     title="Customer Satisfaction Levels Across Different Service Channels",
-                     color_discrete_map={'Online': 'mistyrose', 'In-Store': 'skyblue', 'Phone Support': 'salmon'})
-fig5.update_layout(height=850, width=1200)
-st.plotly_chart(fig5)
-
-st.subheader("Environmental Impact of Energy Sources")
-grp1 = {
-    "metric": ["Carbon Emissions", "Land Use", "Water Use", "Air Pollution", "Waste Generation"],
-    "solar": [2, 4, 3, 1, 2],
-    "coal": [10, 3, 8, 10, 9],
-    "nuclear": [3, 2, 5, 3, 7]
-}
-grp1 = pd.DataFrame(grp1)
-grp1 = grp1.melt(id_vars='metric', var_name='Type', value_name='Num')
-
-fig6 = px.line_polar(grp1, r='Num', theta='metric', color='Type', line_close=True, 
-                     line_shape='spline', markers='o',
-                     color_discrete_map={'solar': 'lightpink', 'coal': 'burlywood', 'nuclear': 'skyblue'},
-                     template='plotly_dark')
-fig6.update_layout(height=850, width=1200)
-st.plotly_chart(fig6)
-
-
-
-st.subheader('Crypto Performace Analysis')
-plt.style.use('dark_background')
-labels = ['Bitcoin', 'Ethereum', 'Ripple']
-sizes = [45, 30, 25]
-colors = ['gold', 'plum', 'burlywood']
-
-angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
-fig, ax = plt.subplots(figsize=(5,5), subplot_kw=dict(polar=True))
-ax.bar(angles, sizes, width=0.3, color=colors, align='edge', alpha=0.7)
-
-ax.set_xticks(angles)
-ax.set_xticklabels(labels)
-ax.set_title("Polar Chart")
-st.pyplot(fig, use_container_width=False)
-
-plt.style.use('default')
-st.subheader("Gapmider: 2007 GDP Analysis")
-df00 = px.data.gapminder()
-df_2007 = df00.query("year==2007")
-
-for template in ["plotly", "plotly_white", "plotly_dark", "ggplot2", "seaborn", "simple_white", "none"]:
+
+@cached_figure
+def population_treemap():
+    df3 = get_slice("gapminder", "year_2007")
+    fig3 = px.treemap(df3, path=[px.Constant("world"), 'continent', 'country'], values='pop',
+                       color='lifeExp', hover_data=['iso_alpha'],
+                       title='Treemap of Population Distribution',
+                       color_continuous_scale='tealrose',
+                       color_continuous_midpoint=np.average(df3['lifeExp'], weights=df3['pop']))
+    fig3.update_layout(margin=dict(t=50, l=25, r=25, b=25))
+    return fig3
+
+plotly_chart(population_treemap())
+
+
+# Everything below the treemap sits in collapsed expanders and is only
+# built once the reader opens it.
+
+@cached_figure
+def stock_performance(window=5, budget=point_budget(1300)):
+    # Rolling mean and down-sampling happen here; only the trend lines are sent.
+    df4 = get_dataset("stocks")
+    trend = downsample(rolling_mean(df4, window), None, df4.columns, budget)
+    fig4 = px.line(trend, title="Stock Performance")
+    fig4.update_traces(showlegend=True)
+    fig4.update_layout(width=1300, height=500)
+    return fig4
+
+section = lazy_expander("Stock Performance Analysis", key="stocks")
+with section:
+    if section.open:
+        plotly_chart(stock_performance())
+
+
+section = lazy_expander("Customer Satisfaction Across Service Channels", key="satisfaction")
+with section:
+    if section.open:
+        data222 = {
+            'ease_of_use': [80, 70, 65],
+            'responsiveness': [75, 85, 90],
+            'quality_of_service': [85, 80, 75],
+            'overall_satisfaction': [78, 83, 82]
+        }
+        df5 = pd.DataFrame(data222)
+        df5['Row'] = ['Online', 'In-Store', 'Phone support']
+        df_melted = df5.melt(id_vars='Row', value_vars=df5.columns[:-1], var_name='Category', value_name='Value')
+
+        @cached_figure
+        def satisfaction_polar(df_melted):
+            fig5 = px.line_polar(df_melted, r='Value', theta='Category', color='Row', line_close=True, 
+                                 template='plotly_dark', markers='X',
+                                 title="Customer Satisfaction Levels Across Different Service Channels",
+                                 color_discrete_map={'Online': 'mistyrose', 'In-Store': 'skyblue', 'Phone Support': 'salmon'})
+            fig5.update_layout(height=850, width=1200)
+            return fig5
+
+        plotly_chart(satisfaction_polar(df_melted))
+
+section = lazy_expander("Environmental Impact of Energy Sources", key="energy")
+with section:
+    if section.open:
+        grp1 = {
+            "metric": ["Carbon Emissions", "Land Use", "Water Use", "Air Pollution", "Waste Generation"],
+            "solar": [2, 4, 3, 1, 2],
+            "coal": [10, 3, 8, 10, 9],
+            "nuclear": [3, 2, 5, 3, 7]
+        }
+        grp1 = pd.DataFrame(grp1)
+        grp1 = grp1.melt(id_vars='metric', var_name='Type', value_name='Num')
+
+        @cached_figure
+        def energy_polar(grp1):
+            fig6 = px.line_polar(grp1, r='Num', theta='metric', color='Type', line_close=True, 
+                                 line_shape='spline', markers='o',
+                                 color_discrete_map={'solar': 'lightpink', 'coal': 'burlywood', 'nuclear': 'skyblue'},
+                                 template='plotly_dark')
+            fig6.update_layout(height=850, width=1200)
+            return fig6
+
+        plotly_chart(energy_polar(grp1))
+
+
+
+def crypto_polar(fig, labels, sizes, colors):
+    angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=False).tolist()
+    ax = fig.add_subplot(polar=True)
+    ax.bar(angles, sizes, width=0.3, color=colors, align='edge', alpha=0.7)
+
+    ax.set_xticks(angles)
+    ax.set_xticklabels(labels)
+    ax.set_title("Polar Chart")
+
+section = lazy_expander('Crypto Performace Analysis', key="crypto")
+with section:
+    if section.open:
+        labels = ['Bitcoin', 'Ethereum', 'Ripple']
+        sizes = [45, 30, 25]
+        colors = ['gold', 'plum', 'burlywood']
+        st.image(render(crypto_polar, labels, sizes, colors, style='dark_background', figsize=(5,5)))
+
+
+@cached_figure
+def gapminder_2007(template):
+    df_2007 = get_slice("gapminder", "year_2007")
     fig9 = px.scatter(df_2007,
                      x="gdpPercap", y="lifeExp", size="pop", color="continent",
                      log_x=True, size_max=60,
                      template=template, title="Gapminder 2007 GDP")
     fig9.update_layout(height=550, width=1200)
-    st.plotly_chart(fig9)
+    return fig9
+
+section = lazy_expander("Gapmider: 2007 GDP Analysis", key="gapminder_templates")
+with section:
+    if section.open:
+        templates = ["plotly", "plotly_white", "plotly_dark", "ggplot2", "seaborn", "simple_white", "none"]
+        # Only the selected tab's figure is built; the rest come from the cache once visited.
+        for template, tab in zip(templates, st.tabs(templates, key="gapminder_template", on_change="rerun")):
+            with tab:
+                if tab.open:
+                    plotly_chart(gapminder_2007(template))
+
+section = lazy_expander('Profession Vs Salary Analysis', key="salary")
+with section:
+    if section.open:
+        a7 = {
+            'profession': ['Software Engineer', 'Software Engineer', 'Software Engineer', 
+                           'Data Scientist', 'Data Scientist', 'Data Scientist', 
+                           'UX Designer', 'UX Designer', 'UX Designer'],
+            'annual_salary': [138268, 113567, 112613, 115891, 91243, 111993, 125026, 118600, 109512]
+        }
+        a7 = pd.DataFrame(a7)
+
+        @cached_figure
+        def salary_box(a7):
+            fig10 = px.box(a7, x='profession', y='annual_salary', color='profession', 
+                         color_discrete_map={'Software Engineer': 'cyan', 'Data Scientist': 'magenta', 'UX Designer': 'yellowgreen'}, 
+                         points='all', template='plotly_dark')
+            fig10.update_layout(height=550, width=1200)
+            return fig10
 
-a7 = {
-    'profession': ['Software Engineer', 'Software Engineer', 'Software Engineer', 
-                   'Data Scientist', 'Data Scientist', 'Data Scientist', 
-                   'UX Designer', 'UX Designer', 'UX Designer'],
-    'annual_salary': [138268, 113567, 112613, 115891, 91243, 111993, 125026, 118600, 109512]
-}
-a7 = pd.DataFrame(a7)
-st.subheader('Profession Vs Salary Analysis')
-fig10 = px.box(a7, x='profession', y='annual_salary', color='profession', 
-             color_discrete_map={'Software Engineer': 'cyan', 'Data Scientist': 'magenta', 'UX Designer': 'yellowgreen'}, 
-             points='all', template='plotly_dark')
-fig10.update_layout(height=550, width=1200)
-st.plotly_chart(fig10)
+        plotly_chart(salary_box(a7))
 
 
 
-years = np.array(['2012', '2013', '2014', '2015'])
+def region_sales(fig, years, sales_Europe, sales_USCA, sales_africa, sales_Asia_Pacific, sales_LATAM):
+    ax = fig.subplots(ncols=4, sharey=True)
 
-sales_africa = np.array([127187.27, 144480.70, 229068.79, 283036.44])
+    europe, = ax[0].plot(years, sales_Europe, color="red", label="Europe")
+    ax[0].set_title('Sales in Europe')
+    ax[1].bar(years, sales_USCA, label="USCA")
+    ax[1].set_title('Sales in USCA')
+    ax[2].scatter(years, sales_africa, label="Africa")
+    ax[2].set_title('Sales in Africa')
 
-sales_USCA = np.array([492756.60, 486629.30, 627634.98, 757108.13])
+    asia = ax[3].bar(years, sales_Asia_Pacific, width=0.5, color='royalblue', label="Asia Pacific")
+    latam = ax[3].bar(years, sales_LATAM, width=0.5, color='seagreen', bottom=sales_Asia_Pacific, label="LATAM")
 
-sales_LATAM = np.array([385098.15, 464733.29, 608140.77, 706632.93])
+    ax[3].set_title('Sales in Asia Pacific and LATAM')
+    ax[3].legend()
 
-sales_Asia_Pacific = np.array([713658.22, 863983.97, 1092231.65, 1372784.40])
+section = lazy_expander('Multi-Region Sales', key="regions")
+with section:
+    if section.open:
+        years = np.array(['2012', '2013', '2014', '2015'])
 
-sales_Europe = np.array([540750.63, 717611.40, 848670.24, 1180303.95])
+        sales_africa = np.array([127187.27, 144480.70, 229068.79, 283036.44])
 
-fig, ax = plt.subplots(ncols=4, sharey=True, figsize=(20.5, 5.5))
-st.subheader('Multi-Region Sales')
+        sales_USCA = np.array([492756.60, 486629.30, 627634.98, 757108.13])
 
-europe, = ax[0].plot(years, sales_Europe, color="red", label="Europe")
-ax[0].set_title('Sales in Europe')
-ax[1].bar(years, sales_USCA, label="USCA")
-ax[1].set_title('Sales in USCA')
-ax[2].scatter(years, sales_africa, label="Africa")
-ax[2].set_title('Sales in Africa')
+        sales_LATAM = np.array([385098.15, 464733.29, 608140.77, 706632.93])
 
-asia = ax[3].bar(years, sales_Asia_Pacific, width=0.5, color='royalblue', label="Asia Pacific")
-latam = ax[3].bar(years, sales_LATAM, width=0.5, color='seagreen', bottom=sales_Asia_Pacific, label="LATAM")
+        sales_Asia_Pacific = np.array([713658.22, 863983.97, 1092231.65, 1372784.40])
 
-ax[3].set_title('Sales in Asia Pacific and LATAM')
-ax[3].legend()
+        sales_Europe = np.array([540750.63, 717611.40, 848670.24, 1180303.95])
 
-st.pyplot(fig)
+        st.image(render(region_sales, years, sales_Europe, sales_USCA, sales_africa, sales_Asia_Pacific, sales_LATAM,
+                        figsize=(20.5, 5.5)), width="stretch")
 
+prof.finish()
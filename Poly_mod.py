@@ -1,13 +1,13 @@
 import streamlit as st
-import pickle
 import numpy as np
-from sklearn.preprocessing import PolynomialFeatures
-from joblib import load
+from model_registry import get_local_model
+from batch_scoring import batch_section
+from price_grid import get_grid
+from what_if import sweep_section
 
-linear_mod = load('Model/linear_model.joblib')
-logistic_mod = load('Model/logistic_model.joblib')
+linear_mod = get_local_model('linear_model.joblib')
+logistic_mod = get_local_model('logistic_model.joblib')
 
-poly = PolynomialFeatures(degree=4)
 st.header("Input Features")
 feature_1 = st.slider("Select Carat", min_value=0.0, max_value=10.0, value=1.0, step=0.1)
 feature_2 = st.slider("Select Length Of The Diamond", min_value=0, max_value=40, value=0, step=1)
@@ -25,13 +25,19 @@ st.write(f"feature 5: {feature_5}")
 
 if st.button("Predict Price"):
     if feature_5 != 0:
-        input_data = np.array([[feature_1, feature_5, feature_2, feature_3, feature_4]])
-        linear_pred = linear_mod.predict(input_data)
-        if linear_pred < 0:
-            linear_pred = (-1)*(linear_pred)
-        else:
-            linear_pred = linear_pred
-        st.subheader(f"Predicted Price Is: ${linear_pred[0].round()}")
+        # Slider inputs are looked up in the precomputed grid (see price_grid.py);
+        # live inference is only needed when the grid is missing or stale.
+        grid = get_grid()
+        price = grid.price(feature_1, feature_2, feature_3, feature_4) if grid is not None else None
+        if price is None or np.isnan(price):
+            input_data = np.array([[feature_1, feature_5, feature_2, feature_3, feature_4]])
+            linear_pred = linear_mod.predict(input_data)
+            if linear_pred < 0:
+                linear_pred = (-1)*(linear_pred)
+            else:
+                linear_pred = linear_pred
+            price = linear_pred[0].round()
+        st.subheader(f"Predicted Price Is: ${price}")
     else:
         st.error("Cannot predict due to invalid input values.")
         
@@ -47,3 +53,8 @@ if st.button("Recommendation"):
         st.subheader(logistic_pred)
     else:
         st.error("Cannot provide a recommendation due to invalid input values.")
+
+sweep_section(linear_mod, logistic_mod,
+              {"carat": feature_1, "length": feature_2, "width": feature_3, "depth": feature_4})
+
+batch_section(linear_mod, logistic_mod)
@@ -1,37 +1,49 @@
 import streamlit as st
 import numpy as np
-import joblib 
-import requests
-from sklearn.preprocessing import PolynomialFeatures
+import os
+from model_registry import compact_path, get_model, local_path
+from poly_features import get_polynomial_model
+from batch_scoring import batch_section
+from what_if import sweep_section
 
 def download_model(url, filename):
+    # Returns the cached copy without touching the network once there is one;
+    # model_fetch revalidates it in the background (MODEL_REFRESH_SECONDS).
+    import requests
+    from model_fetch import fetch_model
+
     try:
-        response = requests.get(url)
-        response.raise_for_status() 
-        with open(filename, "wb") as f:
-            f.write(response.content)
-    except requests.exceptions.RequestException as e:
+        return fetch_model(url, filename)
+    except (requests.exceptions.RequestException, ValueError, OSError) as e:
         st.error(f"Error downloading model from {url}: {e}")
         return None
-    return filename
 
 url = "https://raw.githubusercontent.com/aniketyadav16/-Data-Science/main/Model/polynomial_model.joblib"
 url2 = "https://raw.githubusercontent.com/aniketyadav16/-Data-Science/main/Model/logistic_model.joblib"
 
-poly_model_file = download_model(url_poly_model, "poly_model.joblib")
-logistic_model_file = download_model(url_logistic_model, "log_model.joblib")
+def model_file(name, url, filename):
+    # Prefer the copy shipped in Model/ so a rerun never touches the network.
+    # MODEL_SOURCE=remote (or a checkout without Model/) uses the published
+    # models instead, downloaded once and then refreshed in the background.
+    if os.environ.get("MODEL_SOURCE", "local") != "remote" and os.path.exists(local_path(name)):
+        return compact_path(local_path(name))
+    return download_model(url, filename)
+
+poly_model_file = model_file("polynomial_model.joblib", url, "poly_model.joblib")
+logistic_model_file = model_file("logistic_model.joblib", url2, "log_model.joblib")
 
 if poly_model_file:
-    linear_mod = joblib.load(poly_model_file)
+    linear_mod = get_polynomial_model(poly_model_file, n_features=5)
 else:
     st.error("Polynomial model could not be loaded. Exiting...")
 
 if logistic_model_file:
-    logistic_mod = joblib.load(logistic_model_file)
+    logistic_mod = get_model(logistic_model_file)
 else:
     st.error("Logistic model could not be loaded. Exiting...")
 
-poly = PolynomialFeatures(degree=4)
+if not (poly_model_file and logistic_model_file):
+    st.stop()
 
 st.header("Input Features")
 feature_1 = st.number_input("Enter Carat")
@@ -49,7 +61,6 @@ else:
 if st.button("Predict"):
     if feature_5 != 0:
         input_data = np.array([[feature_1, feature_5, feature_2, feature_3, feature_4]])
-        input_data = poly.fit_transform(input_data)
         linear_pred = linear_mod.predict(input_data)
         st.subheader(f"Predicted Price: ${linear_pred[0].round()}k")
     else:
@@ -67,3 +78,8 @@ if st.button("Recommendation"):
         st.subheader(logistic_pred)
     else:
         st.error("Cannot provide a recommendation due to invalid input values.")
+
+sweep_section(linear_mod, logistic_mod, {"carat": feature_1, "length": feature_2, "width": feature_3, "depth": feature_4},
+              ratio_scale=1, ratio_decimals=None, absolute=False)
+
+batch_section(linear_mod, logistic_mod, ratio_scale=1, ratio_decimals=None, absolute=False)
@@ -0,0 +1,110 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+POINTS_PER_PIXEL = 2
+DEFAULT_WIDTH_PX = 1500
+MAX_BARS = 120
+
+
+def point_budget(width_px=DEFAULT_WIDTH_PX, points_per_pixel=POINTS_PER_PIXEL):
+    """How many points a line chart of this width can actually show."""
+    return int(width_px * points_per_pixel)
+
+
+def _numeric(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of n_out points that keep the shape of y(x)."""
+    x = _numeric(x)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        nstart, nend = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nstart:nend].mean()
+        avg_y = y[nstart:nend].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def downsample(df, x, columns, budget=None):
+    """Rows of df that keep the shape of every column in columns, at most budget per column.
+
+    Each column is reduced with LTTB on its own non-null rows and the kept rows
+    are merged, so a wide frame can still go straight into px.line.
+    """
+    budget = budget or point_budget()
+    if len(df) <= budget:
+        return df
+    xs = df[x].to_numpy() if x is not None else df.index.to_numpy()
+    keep = []
+    for col in columns:
+        values = df[col].to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(values))
+        keep.append(valid[lttb_indices(xs[valid], values[valid], budget)])
+    return df.iloc[np.unique(np.concatenate(keep))]
+
+
+def sample_rows(df, budget=None, seed=0):
+    """At most budget rows of df, drawn uniformly and kept in their original order.
+
+    For charts that draw every row as its own mark (parallel coordinates,
+    violins, 3-D scatters), where there is no x order for LTTB to follow.
+    """
+    budget = budget or point_budget()
+    if len(df) <= budget:
+        return df
+    keep = np.random.default_rng(seed).choice(len(df), budget, replace=False)
+    return df.iloc[np.sort(keep)]
+
+
+def histogram(values, nbins):
+    """Counts and bin geometry for a bar-rendered histogram."""
+    values = np.asarray(values, dtype=float)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=nbins)
+    return (edges[:-1] + edges[1:]) / 2, counts, np.diff(edges)
+
+
+def rolling_mean(df, window, columns=None):
+    columns = columns if columns is not None else df.columns
+    return df[columns].rolling(window).mean()
+
+
+def time_buckets(df, on, columns, freq, agg="mean", origin="start_day"):
+    return df.resample(freq, on=on, origin=origin)[columns].agg(agg).reset_index()
+
+
+def bucket_to_budget(df, on, columns, max_bars=MAX_BARS, agg="mean"):
+    """Resample a time series into equal buckets so it fits in max_bars bars.
+
+    The bucket width is a whole number of the data's own sampling step (a
+    day for daily data, a minute for minute data), and buckets start at the
+    first timestamp, so the span divides into at most max_bars of them.
+    """
+    if len(df) <= max_bars:
+        return df
+    times = np.sort(df[on].to_numpy())
+    steps = np.diff(times)
+    steps = steps[steps > np.timedelta64(0)]
+    if not len(steps):
+        return df
+    step = pd.Timedelta(steps.min())
+    span = pd.Timedelta(times[-1] - times[0])
+    width = step * math.ceil(span / (max_bars - 1) / step)
+    return time_buckets(df, on, columns, width, agg, origin="start")
@@ -0,0 +1,54 @@
+import math
+
+import numpy as np
+import plotly.graph_objects as go
+
+from aggregation import lttb_indices
+
+MAX_FRAMES = 60
+# Points per trace in one frame; with MAX_FRAMES this bounds the frames'
+# payload whatever the length of the series.
+FRAME_POINTS = 100
+
+
+def frame_stops(n, max_frames=MAX_FRAMES):
+    """Exclusive end indices for cumulative frames: 1..n, strided down to at most max_frames.
+
+    The last stop is always n so the animation finishes on the full series.
+    """
+    if n <= 0:
+        return []
+    if max_frames is None or n <= max_frames:
+        return list(range(1, n + 1))
+    step = math.ceil(n / max_frames)
+    stops = list(range(step, n, step))
+    return stops + [n]
+
+
+def frame_index(stop, max_points=FRAME_POINTS, x=None, y=None):
+    """Which of the first stop points one frame draws: all of them, or at most max_points.
+
+    A short prefix is a slice (numpy slices are views). A longer one is
+    thinned with LTTB on y(x) when y is given, else evenly; the first and
+    last points are always kept.
+    """
+    if max_points is None or stop <= max_points:
+        return slice(0, stop)
+    if y is not None:
+        x = np.arange(stop) if x is None else x[:stop]
+        return lttb_indices(x, y[:stop], max_points)
+    return np.unique(np.linspace(0, stop - 1, max_points).round().astype(np.int64))
+
+
+def cumulative_frames(n, build, traces=None, max_frames=MAX_FRAMES, max_points=FRAME_POINTS, x=None, y=None):
+    """Build one go.Frame per stop from build(index).
+
+    index selects the points of the frame's prefix (see frame_index; pass x
+    and y to thin with LTTB). build should index arrays extracted once up
+    front and only return the attributes that change per frame - everything
+    else stays on the base traces instead of being repeated in every frame.
+    Once a prefix is thinned its x no longer lines up with the base trace's,
+    so build must then return x as well as y.
+    """
+    return [go.Frame(data=build(frame_index(stop, max_points, x, y)), traces=traces, name=str(stop))
+            for stop in frame_stops(n, max_frames)]
@@ -0,0 +1,335 @@
+"""Headless benchmarks for the Streamlit apps.
+
+Each app is driven through a scripted set of interactions with Streamlit's
+AppTest. Every step records:
+
+    wall_s             time of the rerun (best of --repeat; cold_wall_s is the first)
+    figures            per chart: script time since the previous element (build_s),
+                       time to marshal and enqueue it (enqueue_s) and payload bytes
+                       (the proto plus any image bytes it references)
+    payload_bytes      sum of the figure payloads
+    peak_traced_bytes  peak Python/NumPy allocation during the rerun (tracemalloc,
+                       measured in a separate pass so it does not skew the timings)
+
+Every (app, size) pair runs in its own interpreter, so each starts cold.
+AppTest.run() always reruns the whole script: the widgets in Dash2.py's
+st.fragment panels would only rerun their fragment in a browser, but here
+each of those steps times a full-script rerun, so fragment-scoped reruns are
+not measured in isolation. Dashboard.py's steps open its expanders one at a
+time and keep the earlier ones open, so the last step renders all of them.
+Sizes are DeFi periods for Dash2.py and uploaded catalog rows for the batch
+scoring section of Poly_mod.py and Predictor.py; Dashboard.py uses fixed
+datasets and runs once.
+
+    python app_bench.py --sizes 30 10000 1000000 --out bench.json
+    python app_bench.py --apps Poly_mod.py --compare bench.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import element_hook
+from element_hook import CHART_TYPES
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APPS = ["Dash2.py", "Dashboard.py", "Poly_mod.py", "Predictor.py"]
+SIZED = {"Dash2.py", "Poly_mod.py", "Predictor.py"}
+SIZES = [30, 10_000, 100_000]
+# Daily dates run past pandas' Timestamp range at about 100k periods.
+MAX_DAILY_PERIODS = 50_000
+TIMEOUT = 600
+
+
+def _widget(at, kind, label):
+    for w in getattr(at, kind):
+        if w.label == label:
+            return w
+    raise LookupError(f"No {kind} labelled {label!r}")
+
+
+def select(label, value):
+    return lambda at: _widget(at, "selectbox", label).set_value(value)
+
+
+def click(label):
+    return lambda at: _widget(at, "button", label).click()
+
+
+def set_value(kind, label, value):
+    return lambda at: _widget(at, kind, label).set_value(value)
+
+
+def set_states(keys, value):
+    def action(at):
+        for key in keys:
+            at.session_state[key] = value
+    return action
+
+
+def catalog_csv(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(3, 9, rows)
+    buf = io.StringIO()
+    np.savetxt(buf, np.column_stack([rng.uniform(0.2, 3, rows), x, x + rng.normal(0, 0.05, rows), x * 0.62,
+                                     rng.uniform(300, 19000, rows).round()]),
+               delimiter=",", fmt="%.4f", header="carat,x,y,z,price", comments="")
+    return buf.getvalue().encode()
+
+
+def upload(rows):
+    def action(at):
+        at.file_uploader[0].set_value(("catalog.csv", catalog_csv(rows), "text/csv"))
+    return action
+
+
+def scenario(app, size):
+    """[(step name, action or None)] for one app at one data size."""
+    if app == "Dash2.py":
+        return [
+            ("initial", None),
+            ("select pool", select("Select Pool for Volume", "ZAP/USDC")),
+            ("select yield type", select("Select Yield Type", "Farming")),
+            ("select truck", select("Select Truck", "Truck_B")),
+            ("animate user bars", click("Animate User Bars")),
+        ]
+    if app == "Dashboard.py":
+        keys = ["stocks", "satisfaction", "energy", "crypto", "gapminder_templates", "salary", "regions"]
+        return [("initial", None)] + [(f"open {key}", set_states(keys[:i + 1], True)) for i, key in enumerate(keys)]
+    if app == "Poly_mod.py":
+        steps = [
+            ("initial", None),
+            ("set length", set_value("slider", "Select Length Of The Diamond", 6)),
+            ("set width", set_value("slider", "Select Width Of The Diamond", 6)),
+            ("set depth", set_value("slider", "Select Depth Of The Diamond", 4)),
+            ("predict price", click("Predict Price")),
+            ("recommendation", click("Recommendation")),
+        ]
+    else:
+        steps = [
+            ("initial", None),
+            ("set carat", set_value("number_input", "Enter Carat", 1.0)),
+            ("set length", set_value("number_input", "Enter Length Of The Diamond", 6.0)),
+            ("set width", set_value("number_input", "Enter Width Of The Diamond", 6.0)),
+            ("set depth", set_value("number_input", "Enter Depth Of The Diamond", 4.0)),
+            ("predict", click("Predict")),
+            ("recommendation", click("Recommendation")),
+        ]
+    return steps + [("upload catalog", upload(size)), ("score file", click("Score File"))]
+
+
+class ElementRecorder:
+    """Times every chart a rerun emits, through element_hook.
+
+    Image bytes uploaded as media files are charged to the element that is
+    enqueued next.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.last = None
+
+    def __enter__(self):
+        # AppTest runs one session at a time, so listen to every element.
+        self.token = element_hook.subscribe(self._on_element)
+        return self
+
+    def __exit__(self, *exc):
+        element_hook.unsubscribe(self.token)
+
+    def _on_element(self, delta_type, element_proto, start, end, media):
+        if delta_type in CHART_TYPES and self.last is not None:
+            self.events.append({
+                "type": delta_type,
+                "build_s": start - self.last,
+                "enqueue_s": end - start,
+                "bytes": element_proto.ByteSize() + media,
+                "spec": getattr(element_proto, "spec", ""),
+            })
+        self.last = end
+
+    def start(self):
+        self.events = []
+        self.last = time.perf_counter()
+
+    def figures(self):
+        out = []
+        for i, event in enumerate(self.events):
+            event = dict(event)
+            spec = event.pop("spec")
+            title = None
+            if spec:
+                title = json.loads(spec).get("layout", {}).get("title", {})
+                title = title.get("text") if isinstance(title, dict) else title
+            out.append(dict(event, label=(title or "").strip() or f"{event['type']} {i}"))
+        return out
+
+
+def _clear_caches():
+    import streamlit as st
+
+    import mpl_render
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    mpl_render.clear()
+
+
+def _replay(app, steps, on_step):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, app), default_timeout=TIMEOUT)
+    for name, action in steps:
+        if action is not None:
+            action(at)
+        on_step(name, at)
+
+
+def run_app(app, size, repeat=1, memory=True):
+    """Benchmark one app at one size in this process."""
+    if app == "Dash2.py":
+        os.environ["DEFI_PERIODS"] = str(size)
+        os.environ["DEFI_FREQ"] = "D" if size <= MAX_DAILY_PERIODS else "min"
+    sys.path.insert(0, ROOT)
+    steps = scenario(app, size)
+    results = {name: {"step": name, "wall_s": []} for name, _ in steps}
+
+    with ElementRecorder() as recorder:
+        for _ in range(repeat):
+            def timed(name, at):
+                recorder.start()
+                start = time.perf_counter()
+                at.run()
+                results[name]["wall_s"].append(time.perf_counter() - start)
+                if at.exception:
+                    raise RuntimeError(f"{app} {name}: {at.exception[0].value}")
+                figures = recorder.figures()
+                results[name].update(figures=figures, figure_count=len(figures),
+                                     payload_bytes=sum(f["bytes"] for f in figures))
+            _replay(app, steps, timed)
+
+    if memory:
+        _clear_caches()
+        tracemalloc.start()
+
+        def traced(name, at):
+            tracemalloc.reset_peak()
+            at.run()
+            results[name]["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        _replay(app, steps, traced)
+        tracemalloc.stop()
+
+    for step in results.values():
+        walls = step.pop("wall_s")
+        step["cold_wall_s"] = walls[0]
+        step["wall_s"] = min(walls)
+    return {
+        "app": app,
+        "size": size if app in SIZED else None,
+        "steps": list(results.values()),
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(apps, sizes, repeat=1, memory=True):
+    import streamlit
+
+    results = []
+    for app in apps:
+        for size in (sizes if app in SIZED else [None]):
+            cmd = [sys.executable, os.path.abspath(__file__), "--worker", app, "--size", str(size or 0),
+                   "--repeat", str(repeat)] + ([] if memory else ["--no-memory"])
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                # Killed (e.g. out of memory) before it could report anything itself.
+                results.append({"app": app, "size": size, "error": f"worker exited with {proc.returncode}"})
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "streamlit": streamlit.__version__,
+            "machine": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _steps(report):
+    return {(r["app"], r["size"], s["step"]): s for r in report["results"] for s in r.get("steps", [])}
+
+
+def compare(old, new):
+    """Print wall time and payload changes per step."""
+    before = _steps(old)
+    for key, step in _steps(new).items():
+        if key not in before:
+            continue
+        prev = before[key]
+        app, size, name = key
+        change = (step["wall_s"] - prev["wall_s"]) / prev["wall_s"] * 100 if prev["wall_s"] else 0.0
+        print(f"{app:14} {str(size or ''):>9} {name:22} {prev['wall_s'] * 1000:9.1f} -> "
+              f"{step['wall_s'] * 1000:9.1f} ms ({change:+6.1f}%)  "
+              f"{prev['payload_bytes']:>10,} -> {step['payload_bytes']:>10,} B")
+
+
+def summary(report):
+    for r in report["results"]:
+        if "error" in r:
+            print(f"{r['app']} size={r['size']}: FAILED {r['error']}")
+            continue
+        print(f"{r['app']} size={r['size']} (max RSS {r['max_rss_bytes'] / 2**20:.0f} MiB)")
+        for s in r["steps"]:
+            peak = s.get("peak_traced_bytes")
+            peak = f"{peak / 2**20:8.1f} MiB" if peak is not None else ""
+            print(f"  {s['step']:22} {s['wall_s'] * 1000:9.1f} ms  {s['figure_count']:3} figs "
+                  f"{s['payload_bytes']:>12,} B {peak}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Streamlit apps headlessly.")
+    parser.add_argument("--apps", nargs="+", default=APPS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--repeat", type=int, default=1, help="timing passes per app; the first is cold")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="previous JSON report to diff against")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        try:
+            result = run_app(args.worker, args.size, args.repeat, not args.no_memory)
+        except Exception as e:
+            result = {"app": args.worker, "size": args.size, "error": f"{type(e).__name__}: {e}"}
+        print(json.dumps(result))
+        sys.exit(0)
+
+    report = run_all(args.apps, args.sizes, args.repeat, not args.no_memory)
+    summary(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
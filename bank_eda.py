@@ -0,0 +1,232 @@
+"""Chunked version of the Bank Marketing Campaign EDA.
+
+Reads bnkdata.csv in fixed-size chunks, cleans each chunk with vectorized
+ops, and folds it into mergeable partial aggregates (counts, value counts and
+count/mean/M2 moments), so memory is bounded by the chunk size plus the
+number of distinct group values. summarize() returns the notebook's summary tables.
+
+Medians and 75th percentiles come from per-group value counts capped at
+MAX_VALUES values: they are exact while a group has no more distinct values
+than that, and approximate (to within one merged bin) once it does. The
+means stay exact either way.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 100_000
+
+CSV_DTYPES = {
+    "customerid": "int64",
+    "age": "float64",
+    "salary": "int64",
+    "balance": "int64",
+    "marital": str,
+    "jobedu": str,
+    "targeted": str,
+    "default": str,
+    "housing": str,
+    "loan": str,
+    "contact": str,
+    "day": "int64",
+    "month": str,
+    "duration": str,
+    "campaign": "int64",
+    "pdays": "int64",
+    "previous": "int64",
+    "poutcome": str,
+    "response": str,
+}
+
+AGE_BINS = [0, 30, 40, 50, 60, float("inf")]
+AGE_LABELS = ["<30", "30-40", "40-50", "50-60", "60+"]
+
+COUNT_COLUMNS = ["marital", "job", "edu", "poutcome", "response"]
+RATE_GROUPS = {
+    "edu": ["edu"],
+    "marital": ["marital"],
+    "loan": ["loan"],
+    "housing": ["housing"],
+    "age_bucket": ["age_bucket"],
+    "edu_marital": ["edu", "marital"],
+    "job_marital": ["job", "marital"],
+    "edu_poutcome": ["edu", "poutcome"],
+}
+# (group column, value column) pairs that need mean, median and 75th percentile.
+DISTRIBUTIONS = [("response", "salary"), ("response", "balance"), ("edu", "salary")]
+# Distinct values kept per group for those quantiles; bnkdata.csv has about
+# 7k distinct balances, so its summary stays exact.
+MAX_VALUES = 10_000
+DESCRIBE_COLUMNS = ["age", "salary", "balance", "pdays", "duration_in_sec"]
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    return pd.read_csv(path, skiprows=2, dtype=CSV_DTYPES, chunksize=chunk_rows)
+
+
+def clean_chunk(data):
+    data = data.dropna(subset=["age", "response"])
+
+    jobedu = data["jobedu"].str.split(",", n=1, expand=True)
+    month = data["month"].fillna("").str.split(",", n=1).str[0]
+    duration = data["duration"].str.extract(r"([\d.]+)\s*(\w+)")
+    seconds = pd.to_numeric(duration[0]) * np.where(duration[1].str.lower().str.startswith("min"), 60.0, 1.0)
+
+    return data.drop(columns=["customerid", "jobedu", "duration"]).assign(
+        job=jobedu[0],
+        edu=jobedu[1],
+        month=month.mask(month == "", "May"),
+        duration_in_sec=seconds,
+        pdays=data["pdays"].mask(data["pdays"] == -1).astype("float64"),
+        res_flag=(data["response"] == "yes").astype("int64"),
+        age_bucket=pd.cut(data["age"], bins=AGE_BINS, labels=AGE_LABELS, right=False).astype(str),
+    )
+
+
+def _merge(total, part):
+    return part if total is None else total.add(part, fill_value=0)
+
+
+def _merge_moments(a, b):
+    """Combine two count/mean/m2 frames with Chan et al.'s parallel update.
+
+    m2 is the sum of squared deviations from the mean; merging it this way
+    avoids the cancellation of a sum-of-squares formula on large values.
+    """
+    count = a["count"] + b["count"]
+    delta = (b["mean"] - a["mean"]).fillna(0)
+    share = (b["count"] / count).fillna(0)
+    return pd.DataFrame({
+        "count": count,
+        "mean": a["mean"].fillna(b["mean"]) + delta * share,
+        "m2": a["m2"] + b["m2"] + delta ** 2 * a["count"] * share,
+        "min": np.fmin(a["min"], b["min"]),
+        "max": np.fmax(a["max"], b["max"]),
+    })
+
+
+def _compact(counts, max_values=MAX_VALUES):
+    """Cap a (group, value) -> count Series at max_values values per group.
+
+    A group over the cap has neighbouring values merged pairwise, into their
+    count-weighted mean with the counts summed, until it fits. Each merge
+    keeps the group's count and sum (so its mean), and a quantile can only
+    move within the merged bin.
+    """
+    sizes = counts.groupby(level=0).size()
+    if (sizes <= max_values).all():
+        return counts
+    parts = {}
+    for group, group_counts in counts.groupby(level=0):
+        group_counts = group_counts.droplevel(0).sort_index()
+        while len(group_counts) > max_values:
+            pair = np.arange(len(group_counts)) // 2
+            n = group_counts.to_numpy(dtype=float)
+            total = np.bincount(pair, n)
+            means = np.bincount(pair, group_counts.index.to_numpy(dtype=float) * n) / total
+            group_counts = pd.Series(total, index=means)
+        parts[group] = group_counts
+    return pd.concat(parts, names=counts.index.names)
+
+
+def _quantile(counts, q):
+    """Linear-interpolated quantile (pandas' default) from a value -> count Series."""
+    counts = counts[counts > 0].sort_index()
+    cum = counts.cumsum().to_numpy()
+    values = counts.index.to_numpy(dtype=float)
+    pos = q * (cum[-1] - 1)
+    lo = values[np.searchsorted(cum, np.floor(pos), side="right")]
+    hi = values[np.searchsorted(cum, np.ceil(pos), side="right")]
+    return lo + (hi - lo) * (pos - np.floor(pos))
+
+
+class BankSummary:
+    def __init__(self):
+        # Rows left after dropping null age and response: the notebook's
+        # hardcoded 45161 (45211 read, 20 null ages, 30 null responses), and
+        # the denominator of every perc column.
+        self.rows = 0
+        self.counts = {}
+        self.rates = {}
+        self.values = {}
+        self.campaign = None
+        self.moments = None
+
+    def update(self, data):
+        self.rows += len(data)
+        for col in COUNT_COLUMNS:
+            self.counts[col] = _merge(self.counts.get(col), data[col].value_counts())
+        for name, keys in RATE_GROUPS.items():
+            part = data.groupby(keys)["res_flag"].agg(["sum", "count"])
+            self.rates[name] = _merge(self.rates.get(name), part)
+        for key in DISTRIBUTIONS:
+            self.values[key] = _compact(_merge(self.values.get(key), data.groupby(list(key)).size()))
+        self.campaign = _merge(self.campaign, data.groupby("job")["campaign"].sum())
+
+        cols = data[DESCRIBE_COLUMNS]
+        mean = cols.mean()
+        part = pd.DataFrame({"count": cols.count(), "mean": mean, "m2": ((cols - mean) ** 2).sum(),
+                             "min": cols.min(), "max": cols.max()})
+        self.moments = part if self.moments is None else _merge_moments(self.moments, part)
+        return self
+
+    def summarize(self):
+        out = {}
+        for col, counts in self.counts.items():
+            counts = counts.sort_index().astype("int64")
+            out[f"{col}_counts"] = pd.DataFrame({"count": counts, "perc": counts / self.rows * 100})
+
+        for name, agg in self.rates.items():
+            rate = agg["sum"] / agg["count"]
+            keys = RATE_GROUPS[name]
+            if len(keys) == 2:
+                rate = rate.unstack(keys[1])
+            elif name == "age_bucket":
+                rate = rate.reindex(AGE_LABELS)
+            out[f"response_rate_by_{name}"] = rate
+
+        for (by, col), counts in self.values.items():
+            rows = {}
+            for group, group_counts in counts.groupby(level=0):
+                group_counts = group_counts.droplevel(0)
+                values = group_counts.index.to_numpy(dtype=float)
+                rows[group] = {
+                    f"mean_{col}": (values * group_counts).sum() / group_counts.sum(),
+                    f"median_{col}": _quantile(group_counts, 0.5),
+                    "percentile_75": _quantile(group_counts, 0.75),
+                }
+            out[f"{col}_by_{by}"] = pd.DataFrame.from_dict(rows, orient="index").rename_axis(by)
+
+        out["campaign_by_job"] = self.campaign.astype("int64")
+
+        m = self.moments
+        std = np.sqrt(m["m2"] / (m["count"] - 1))
+        out["describe"] = pd.DataFrame({"count": m["count"], "mean": m["mean"], "std": std,
+                                        "min": m["min"], "max": m["max"]})
+        return out
+
+
+def summarize_file(path, chunk_rows=CHUNK_ROWS):
+    summary = BankSummary()
+    for chunk in read_chunks(path, chunk_rows):
+        summary.update(clean_chunk(chunk))
+    return summary.summarize()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a bank marketing campaign export in chunks.")
+    parser.add_argument("csv")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--out", help="directory to write one CSV per summary table")
+    args = parser.parse_args()
+
+    tables = summarize_file(args.csv, args.chunk_rows)
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        for name, table in tables.items():
+            table.to_csv(os.path.join(args.out, f"{name}.csv"))
+    else:
+        for name, table in tables.items():
+            print(f"\n== {name}\n{table}")
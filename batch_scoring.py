@@ -0,0 +1,186 @@
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from diamond_features import depth_ratio, price_matrix, recommend_matrix
+
+CHUNK_ROWS = 50_000
+INPUT_COLUMNS = ["carat", "x", "y", "z"]
+OUTPUT_COLUMNS = ["feature_5", "predicted_price"]
+# The in-app download holds the whole result in memory; larger outputs need the CLI.
+MAX_DOWNLOAD_BYTES = 200 * 1024 * 1024
+
+
+def is_parquet(name):
+    return str(name).lower().endswith((".parquet", ".pq"))
+
+
+def read_chunks(source, name=None, chunk_rows=CHUNK_ROWS):
+    """Yield DataFrames of at most chunk_rows rows from a CSV or Parquet file/path."""
+    name = name or getattr(source, "name", source)
+    if is_parquet(name):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        from collections import defaultdict
+
+        import pandas as pd
+
+        # Model inputs are always read as float and every other column as text,
+        # so no column can change type between chunks (e.g. blank, then filled).
+        dtype = defaultdict(lambda: str, {c: float for c in INPUT_COLUMNS + ["price"]})
+        yield from pd.read_csv(source, chunksize=chunk_rows, dtype=dtype)
+
+
+def score_chunk(chunk, linear_mod, logistic_mod=None, ratio_scale=100, ratio_decimals=1, absolute=True):
+    """Add feature_5, predicted_price and (with a logistic model and a price column) recommendation.
+
+    Rows with a missing or non-finite input, or a zero depth ratio, get no
+    predicted_price, and no recommendation either; neither does a row
+    without a finite price.
+    absolute=True reports |price| as Poly_mod does; Predictor shows the signed prediction.
+    """
+    missing = [c for c in INPUT_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    carat, x, y, z = (chunk[c].to_numpy(dtype=float) for c in INPUT_COLUMNS)
+    ratio = depth_ratio(x, y, z, scale=ratio_scale, decimals=ratio_decimals)
+    # Like the server, score only rows whose inputs are all finite numbers.
+    valid = np.isfinite(np.column_stack([carat, x, y, z])).all(axis=1) & (ratio != 0)
+
+    out = chunk.copy()
+    out["feature_5"] = ratio
+    price = np.full(len(chunk), np.nan)
+    if valid.any():
+        price[valid] = linear_mod.predict(price_matrix(carat, x, y, z, ratio)[valid])
+        if absolute:
+            price = np.abs(price)
+    out["predicted_price"] = price.round()
+
+    if logistic_mod is not None and "price" in chunk.columns:
+        offer = chunk["price"].to_numpy(dtype=float)
+        priced = valid & np.isfinite(offer)
+        rec = np.full(len(chunk), "", dtype=object)
+        if priced.any():
+            X = recommend_matrix(offer, carat, x, y, z, ratio)[priced]
+            rec[priced] = np.where(logistic_mod.predict(X) == 1, "BUY", "DO NOT BUY")
+        out["recommendation"] = rec
+    return out
+
+
+def output_schema(table):
+    """The schema every Parquet output chunk is cast to.
+
+    It is taken from the first chunk. Integer columns are widened to
+    float64, since a later chunk with a blank or a decimal in the same
+    column is inferred as float. A column that is blank throughout the
+    first chunk has no type yet: the model inputs and scores become
+    float64, anything else a string, which every later value casts to.
+    """
+    import pyarrow as pa
+
+    numeric = set(INPUT_COLUMNS + ["price"] + OUTPUT_COLUMNS)
+
+    def widen(field):
+        if pa.types.is_integer(field.type):
+            return field.with_type(pa.float64())
+        if pa.types.is_null(field.type):
+            return field.with_type(pa.float64() if field.name in numeric else pa.string())
+        return field
+
+    return pa.schema([widen(f) for f in table.schema], metadata=table.schema.metadata)
+
+
+def score_file(source, destination, linear_mod, logistic_mod=None, name=None,
+               chunk_rows=CHUNK_ROWS, progress=None, **kwargs):
+    """Score source chunk by chunk and append each result to destination.
+
+    Only one chunk is held in memory at a time. Returns the number of rows
+    written; an empty input still produces a valid file with the score columns.
+    """
+    writer = None
+    schema = None
+    rows = 0
+    try:
+        for i, chunk in enumerate(read_chunks(source, name=name, chunk_rows=chunk_rows)):
+            scored = score_chunk(chunk, linear_mod, logistic_mod, **kwargs)
+            if is_parquet(destination):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(scored, preserve_index=False)
+                if writer is None:
+                    schema = output_schema(table)
+                    writer = pq.ParquetWriter(destination, schema)
+                writer.write_table(table.cast(schema))
+            else:
+                scored.to_csv(destination, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(scored)
+            if progress is not None:
+                progress(rows)
+        if rows == 0 and writer is None:
+            import pandas as pd
+
+            empty = pd.DataFrame({c: pd.Series(dtype=float) for c in INPUT_COLUMNS + OUTPUT_COLUMNS})
+            if is_parquet(destination):
+                empty.to_parquet(destination, index=False)
+            else:
+                empty.to_csv(destination, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def batch_section(linear_mod, logistic_mod, key="batch", **kwargs):
+    import streamlit as st
+
+    st.header("Batch Scoring")
+    upload = st.file_uploader("Upload a CSV or Parquet file with carat, x, y, z (and optionally price) columns",
+                              type=["csv", "parquet"], key=key)
+    if upload is None:
+        return
+
+    if st.button("Score File", key=f"{key}_run"):
+        suffix = ".parquet" if is_parquet(upload.name) else ".csv"
+        fd, out_path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        status = st.empty()
+        try:
+            rows = score_file(upload, out_path, linear_mod, logistic_mod, name=upload.name,
+                              progress=lambda n: status.write(f"Scored {n:,} rows..."), **kwargs)
+        except ValueError as e:
+            st.error(f"Cannot score this file: {e}")
+            os.remove(out_path)
+            return
+        status.write(f"Scored {rows:,} rows.")
+        size = os.path.getsize(out_path)
+        if size > MAX_DOWNLOAD_BYTES:
+            # st.download_button keeps the whole payload in memory.
+            st.warning(f"The result is {size / 2**20:,.0f} MB, over the {MAX_DOWNLOAD_BYTES / 2**20:,.0f} MB "
+                       "download limit; score this file with `python batch_scoring.py` instead.")
+        else:
+            with open(out_path, "rb") as f:
+                st.download_button("Download Results", f.read(),
+                                   file_name=f"scored_{os.path.splitext(upload.name)[0]}{suffix}",
+                                   key=f"{key}_download")
+        os.remove(out_path)
+
+
+if __name__ == "__main__":
+    from model_registry import get_local_model
+
+    parser = argparse.ArgumentParser(description="Price and recommend a catalog of diamonds.")
+    parser.add_argument("input", help="CSV or Parquet file with carat, x, y, z (and optionally price)")
+    parser.add_argument("output", help="CSV or Parquet file to write")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    n = score_file(args.input, args.output, get_local_model("linear_model.joblib"),
+                   get_local_model("logistic_model.joblib"), chunk_rows=args.chunk_rows)
+    print(f"Scored {n} rows -> {args.output}")
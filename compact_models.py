@@ -0,0 +1,142 @@
+"""A scikit-learn-free format for the diamond models.
+
+An artifact is a single .npz holding the coefficient arrays plus a JSON
+"meta" entry (kind, feature order, source estimator):
+
+    coef       (n_terms,) for regressors, (1, n_terms) for the classifier
+    intercept  (1,)
+    powers     (n_terms, n_features) exponent table, polynomial models only
+    classes    (2,) class labels, classifier only
+
+CompactModel.predict reproduces the fitted estimator's predict exactly, using
+NumPy alone; predict_proba agrees with the classifier's to rounding.
+
+    python compact_models.py Model/linear_model.joblib Model/logistic_model.joblib \\
+        --polynomial Model/polynomial_model.joblib
+"""
+import json
+import os
+
+import numpy as np
+
+from poly_features import expand, exponent_table, infer_degree
+
+FORMAT_VERSION = 1
+
+
+class CompactModel:
+    def __init__(self, kind, coef, intercept, features, powers=None, classes=None, meta=None):
+        self.kind = kind
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.features = list(features)
+        self.powers = powers
+        self.classes_ = classes
+        self.meta = meta or {}
+        self.n_features_in_ = len(self.features)
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return expand(X, self.powers) if self.powers is not None else X
+
+    def decision_function(self, X):
+        scores = self.transform(X) @ self.coef_.T + self.intercept_
+        return scores.ravel() if self.classes_ is not None else scores
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if self.classes_ is None:
+            return scores
+        return self.classes_[(scores > 0).astype(int)]
+
+    def predict_proba(self, X):
+        if self.classes_ is None:
+            raise AttributeError(f"{self.kind} model has no predict_proba")
+        p = 1 / (1 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1 - p, p])
+
+    def __repr__(self):
+        return f"CompactModel({self.kind}, features={self.features})"
+
+
+def read_arrays(path):
+    """({name: ndarray}, meta) stored in a compact .npz."""
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {k: data[k] for k in data.files}
+    return arrays, json.loads(str(arrays.pop("meta")))
+
+
+def from_arrays(arrays, meta, path="<arrays>"):
+    if meta.get("format", 0) > FORMAT_VERSION:
+        raise ValueError(f"{path} uses compact format {meta['format']}, this reader supports {FORMAT_VERSION}")
+    return CompactModel(meta["kind"], arrays["coef"], arrays["intercept"], meta["features"],
+                        arrays.get("powers"), arrays.get("classes"), meta)
+
+
+def load_compact(path):
+    return from_arrays(*read_arrays(path), path)
+
+
+def export(estimator, path, features=None, polynomial=False, source=None):
+    """Write a fitted LinearRegression/Ridge/LogisticRegression as a compact .npz.
+
+    polynomial=True means the estimator was fitted on PolynomialFeatures of
+    `features` (with bias); the degree is read off the coefficient count.
+    """
+    features = list(features if features is not None else estimator.feature_names_in_)
+    classes = getattr(estimator, "classes_", None)
+    coef = np.asarray(estimator.coef_, dtype=float)
+    intercept = np.atleast_1d(np.asarray(estimator.intercept_, dtype=float))
+    arrays = {"coef": coef, "intercept": intercept}
+
+    if classes is not None:
+        if len(classes) != 2:
+            raise ValueError(f"Only binary classifiers are supported, got classes {list(classes)}")
+        kind = "logistic"
+        arrays["classes"] = np.asarray(classes)
+    elif polynomial:
+        kind = "polynomial"
+        arrays["powers"] = exponent_table(len(features), infer_degree(coef.size, len(features)))
+    else:
+        kind = "linear"
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "kind": kind,
+        "features": features,
+        "estimator": type(estimator).__name__,
+        "source": source,
+    }
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+def export_file(path, features=None, polynomial=False):
+    from joblib import load
+
+    from model_registry import file_sha256
+
+    out = os.path.splitext(path)[0] + ".npz"
+    source = {"file": os.path.basename(path), "sha256": file_sha256(path)}
+    return export(load(path), out, features, polynomial, source)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from diamond_features import PRICE_FEATURES
+
+    parser = argparse.ArgumentParser(description="Export joblib models to the compact .npz format.")
+    parser.add_argument("models", nargs="*", help="linear or logistic .joblib/.pkl artifacts")
+    parser.add_argument("--polynomial", nargs="*", default=[],
+                        help="artifacts fitted on polynomial expansions of the price features")
+    args = parser.parse_args()
+
+    for path in args.models:
+        print(export_file(path))
+    for path in args.polynomial:
+        print(export_file(path, PRICE_FEATURES, polynomial=True))
@@ -0,0 +1,78 @@
+import threading
+
+import pandas as pd
+import plotly
+import plotly.express as px
+
+import shared_store
+
+_lock = threading.Lock()
+_datasets = {}
+_slices = {}
+
+LOADERS = {
+    "gapminder": px.data.gapminder,
+    "wind": px.data.wind,
+    "stocks": lambda: px.data.stocks(indexed=True, datetimes=True),
+}
+
+# Datasets that can be published to the shared store, and the version to publish them under.
+VERSIONS = {name: f"plotly-{plotly.__version__}" for name in LOADERS}
+
+SLICES = {
+    ("gapminder", "year_2007"): lambda df: df[df["year"] == 2007],
+}
+
+
+def compact(df, max_ratio=0.5):
+    """Store repeated string columns as categoricals."""
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype):
+            if df[col].nunique() <= max_ratio * len(df):
+                df[col] = df[col].astype("category")
+    return df
+
+
+def get_dataset(name):
+    """Parse a dataset once per process and hand every caller the same table.
+
+    The returned frame is shared, so treat it as read-only. With
+    SHARED_STORE_DIR set, versioned datasets are also shared between processes.
+    """
+    with _lock:
+        if name not in _datasets:
+            build = lambda: compact(LOADERS[name]())
+            if shared_store.enabled() and name in VERSIONS:
+                tables = shared_store.get_or_build_tables(f"dataset_{name}", VERSIONS[name], lambda: {name: build()})
+                _datasets[name] = tables[name]
+            else:
+                _datasets[name] = build()
+        return _datasets[name]
+
+
+def get_slice(name, slice_name):
+    df = get_dataset(name)
+    with _lock:
+        key = (name, slice_name)
+        if key not in _slices:
+            _slices[key] = SLICES[key](df)
+        return _slices[key]
+
+
+def register(name, loader, slices=None, version=None):
+    """Add or replace a dataset; pass a version to share it through the shared store."""
+    with _lock:
+        LOADERS[name] = loader
+        if version is None:
+            VERSIONS.pop(name, None)
+        else:
+            VERSIONS[name] = version
+        _datasets.pop(name, None)
+        for slice_name, fn in (slices or {}).items():
+            SLICES[(name, slice_name)] = fn
+            _slices.pop((name, slice_name), None)
+
+
+def memory_usage():
+    with _lock:
+        return {name: int(df.memory_usage(deep=True).sum()) for name, df in _datasets.items()}
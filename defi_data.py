@@ -0,0 +1,141 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import shared_store
+from group_index import GroupIndex
+
+FRAMES = ["pipeline", "defi", "truck", "nebula"]
+NEBULA_METRICS = ["ETH_Price", "BTC_Price", "ETH_TVL", "BTC_TVL", "ETH_Volume", "BTC_Volume"]
+
+
+def synthetic_frames(seed=42, periods=30, freq="D"):
+    # Each block reseeds exactly like the original inline code did, so these
+    # frames are unchanged for the default seed and period count. (The
+    # volume_surface noise is not: it now has its own seed.)
+    n = periods
+    dates = pd.date_range("2025-03-01", periods=n, freq=freq)
+
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame({
+        "Date": dates,
+        "ETH_Gas_Cost": rng.uniform(1.2, 4, n),
+        "BTC_Mempool_Size_MB": rng.uniform(50, 150, n),
+        "Pipeline_Latency_Sec": rng.uniform(0.5, 2.0, n)
+    })
+    df["Day"] = df.index + 1
+
+    rng = np.random.RandomState(seed)
+    df_defi = pd.DataFrame({
+        "Date": dates,
+        "Swap_Volume_USD": rng.uniform(50000, 150000, n),
+        "Liquidity_USD": rng.uniform(200000, 500000, n),
+        "Gas_Cost_ETH": rng.uniform(0.01, 0.05, n),
+        "Active_Users": rng.randint(50, 200, n),
+        "Yield_APR": rng.uniform(5, 25, n) + rng.randn(n) * 5,
+        "Whale_Trades": rng.poisson(5, n),
+        "Pool": rng.choice(["ZAP/ETH", "ZAP/USDC"], n)
+    })
+    df_defi["Yield_Type"] = rng.choice(["Staking", "Farming", "Lending"], len(df_defi))
+    df_defi["APR_Size"] = df_defi["Yield_APR"].abs()
+    df_defi["Day"] = df_defi.index + 1
+
+    df_truck = pd.DataFrame({
+        "Date": dates,
+        "ETH_Gas_Cost": rng.uniform(0.02, 0.08, n),
+        "BTC_Tx_Fee": rng.uniform(0.0005, 0.002, n),
+        "Haul_Value_USD": rng.uniform(10000, 50000, n),
+        "Driver_Payout_ETH": rng.uniform(0.1, 0.5, n),
+        "Truck_ID": rng.choice(["Truck_A", "Truck_B", "Truck_C"], n),
+        "ETH_Price_USD": 3000 + rng.randn(n) * 100,
+        "BTC_Price_USD": 60000 + rng.randn(n) * 2000,
+        "ETH_Wallet_Count": rng.randint(20, 100, n),
+        "BTC_Mempool_Size_MB": rng.uniform(50, 150, n)
+    })
+    df_truck["Day"] = df_truck.index + 1
+
+    rng = np.random.RandomState(seed)
+    df_nebula = pd.DataFrame({
+        "Date": dates,
+        "ETH_Price": 3000 + rng.randn(n) * 100,
+        "BTC_Price": 60000 + rng.randn(n) * 2000,
+        "ETH_TVL": rng.uniform(5000000, 15000000, n),
+        "BTC_TVL": rng.uniform(2000000, 8000000, n),
+        "ETH_Volume": rng.uniform(1000000, 5000000, n),
+        "BTC_Volume": rng.uniform(800000, 3000000, n)
+    })
+    df_nebula["Day"] = df_nebula.index + 1
+
+    return {"pipeline": df, "defi": df_defi, "truck": df_truck, "nebula": df_nebula}
+
+
+def parquet_frames(directory):
+    """Read <directory>/<name>.parquet for every name in FRAMES."""
+    return {name: pd.read_parquet(os.path.join(directory, f"{name}.parquet")) for name in FRAMES}
+
+
+def save_parquet_frames(frames, directory):
+    os.makedirs(directory, exist_ok=True)
+    for name in FRAMES:
+        frames[name].to_parquet(os.path.join(directory, f"{name}.parquet"), index=False)
+
+
+def load_frames(seed=42, periods=30, source=None, freq="D"):
+    """Build (or read) the dashboard frames once per process.
+
+    The frames are shared between sessions, so chart code must treat them as
+    read-only. Set DEFI_DATA_SOURCE to a directory of Parquet files to use
+    real data instead of the synthetic generator. With SHARED_STORE_DIR set
+    they are built by the first worker and memory-mapped by the rest.
+    Replacing the source files is picked up on the next rerun.
+    """
+    source = source or os.environ.get("DEFI_DATA_SOURCE")
+    return _load_frames(seed, periods, source, freq, frames_version(seed, periods, source, freq))
+
+
+# The version is part of the cache key, so changed source files get a new
+# entry instead of the one cached for their previous contents.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_frames(seed, periods, source, freq, version):
+    if source:
+        build = lambda: parquet_frames(source)
+    else:
+        build = lambda: synthetic_frames(seed, periods, freq)
+    if not shared_store.enabled():
+        return build()
+    return shared_store.get_or_build_tables("defi_frames", version, build)
+
+
+def frames_version(seed, periods, source, freq):
+    if not source:
+        return f"seed{seed}-p{periods}-{freq}"
+    # Real data is versioned by the files it came from, so replacing them publishes a new version.
+    stats = [os.stat(os.path.join(source, f"{name}.parquet")) for name in FRAMES]
+    return "src-" + hashlib.sha256(repr([source] + [(s.st_mtime_ns, s.st_size) for s in stats]).encode()).hexdigest()[:16]
+
+
+def load_indexes(seed=42, periods=30, source=None, freq="D"):
+    source = source or os.environ.get("DEFI_DATA_SOURCE")
+    return _load_indexes(seed, periods, source, freq, frames_version(seed, periods, source, freq))
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_indexes(seed, periods, source, freq, version):
+    frames = _load_frames(seed, periods, source, freq, version)
+    return {
+        "truck": GroupIndex(frames["truck"], "Truck_ID"),
+        "pool": GroupIndex(frames["defi"], "Pool"),
+        "yield_type": GroupIndex(frames["defi"], "Yield_Type"),
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def volume_surface(seed=42, size=50):
+    x = np.linspace(0, 10, size)
+    y = np.linspace(0, 10, size)
+    X, Y = np.meshgrid(x, y)
+    Z = np.sin(X) * np.cos(Y) * np.random.RandomState(seed).rand(size, size) * 100
+    return X, Y, Z
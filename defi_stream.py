@@ -0,0 +1,153 @@
+import os
+import time
+
+import numpy as np
+
+STREAM_COLUMNS = ["ETH_Gas_Cost", "BTC_Mempool_Size_MB", "Swap_Volume_USD"]
+STREAM_RANGES = {
+    "ETH_Gas_Cost": (1.2, 4),
+    "BTC_Mempool_Size_MB": (50, 150),
+    "Swap_Volume_USD": (50000, 150000),
+}
+# A tailed file is read at most this far back, however far behind the reader is.
+MAX_READ_BYTES = 4 * 1024 * 1024
+
+
+class StreamFormatError(ValueError):
+    """The tailed file does not have the columns the feed needs."""
+
+
+def _empty(columns):
+    return np.array([], dtype="datetime64[ns]"), np.empty((0, len(columns)))
+
+
+class RingBuffer:
+    """Fixed-size, time-stamped rows stored in preallocated NumPy arrays.
+
+    Every row is written twice, at i and i + capacity, so the newest
+    `capacity` rows are always one contiguous slice and view() never copies.
+    """
+
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.times = np.zeros(2 * capacity, dtype="datetime64[ns]")
+        self.values = np.zeros((2 * capacity, len(self.columns)))
+        self.head = 0
+        self.size = 0
+
+    def append(self, times, rows):
+        times = np.asarray(times, dtype="datetime64[ns]")[-self.capacity:]
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(self.columns))[-self.capacity:]
+        pos = (self.head + np.arange(len(rows))) % self.capacity
+        for offset in (0, self.capacity):
+            self.times[pos + offset] = times
+            self.values[pos + offset] = rows
+        self.head = (self.head + len(rows)) % self.capacity
+        self.size = min(self.size + len(rows), self.capacity)
+        return len(rows)
+
+    def view(self):
+        start = self.head + self.capacity - self.size
+        return self.times[start:start + self.size], self.values[start:start + self.size]
+
+    def column(self, name):
+        times, values = self.view()
+        return times, values[:, self.columns.index(name)]
+
+
+class SimulatedSource:
+    """Bounded random walks for each stream column, emitted at `rate` points per second."""
+
+    def __init__(self, columns=STREAM_COLUMNS, rate=2.0, seed=None):
+        self.columns = list(columns)
+        self.rate = rate
+        self.rng = np.random.default_rng(seed)
+        self.low = np.array([STREAM_RANGES[c][0] for c in self.columns])
+        self.high = np.array([STREAM_RANGES[c][1] for c in self.columns])
+        self.last = self.rng.uniform(self.low, self.high)
+        self.clock = time.time()
+
+    def read(self, max_rows=None):
+        """Points due since the last read; after a long idle spell only the newest max_rows."""
+        now = time.time()
+        n = int((now - self.clock) * self.rate)
+        if n <= 0:
+            return _empty(self.columns)
+        if max_rows is not None and n > max_rows:
+            # Skip the points that would not fit in the buffer instead of generating them.
+            self.clock += (n - max_rows) / self.rate
+            n = max_rows
+        steps = self.rng.normal(0, 0.03, (n, len(self.columns))) * (self.high - self.low)
+        rows = np.clip(self.last + np.cumsum(steps, axis=0), self.low, self.high)
+        self.last = rows[-1]
+        times = np.datetime64(int(self.clock * 1e9), "ns") + (np.arange(1, n + 1) / self.rate * 1e9).astype("timedelta64[ns]")
+        self.clock += n / self.rate
+        return times, rows
+
+
+class TailFileSource:
+    """Rows appended to a CSV file whose header names a Date column and the stream columns.
+
+    A file that shrinks (truncated or rotated) is read again from its
+    header. A reader more than max_bytes behind skips ahead to the newest
+    complete lines.
+    """
+
+    def __init__(self, path, columns=STREAM_COLUMNS, max_bytes=MAX_READ_BYTES):
+        self.path = path
+        self.columns = list(columns)
+        self.max_bytes = max_bytes
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.index = None
+        self.partial = b""
+
+    def _read_header(self, f):
+        header = f.readline()
+        if not header.endswith(b"\n"):
+            return False  # still being written
+        fields = header.decode(errors="replace").strip().split(",")
+        missing = [c for c in ["Date"] + self.columns if c not in fields]
+        if missing:
+            raise StreamFormatError(f"{self.path} has no {', '.join(missing)} column(s)")
+        self.index = [fields.index(c) for c in ["Date"] + self.columns]
+        self.offset = f.tell()
+        return True
+
+    def read(self, max_rows=None):
+        if not os.path.exists(self.path):
+            return _empty(self.columns)
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.offset:
+                self._reset()
+            if self.index is None and not self._read_header(f):
+                return _empty(self.columns)
+            skip = size - self.offset > self.max_bytes
+            f.seek(size - self.max_bytes if skip else self.offset)
+            chunk = f.read(self.max_bytes)
+            self.offset = f.tell()
+        if skip:
+            # We landed mid-line; drop everything up to the next line break.
+            self.partial = b""
+            chunk = chunk.split(b"\n", 1)[1] if b"\n" in chunk else b""
+        lines = (self.partial + chunk).split(b"\n")
+        # The last piece is either empty or a line that is still being written.
+        self.partial = lines.pop()
+        if max_rows is not None:
+            lines = lines[-max_rows:]
+
+        times, rows = [], []
+        for line in lines:
+            fields = line.decode(errors="replace").strip().split(",")
+            if fields == [""]:
+                continue
+            try:
+                times.append(np.datetime64(fields[self.index[0]], "ns"))
+                rows.append([float(fields[i]) for i in self.index[1:]])
+            except (ValueError, IndexError):
+                continue
+        return np.array(times, dtype="datetime64[ns]"), np.array(rows).reshape(-1, len(self.columns))
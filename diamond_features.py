@@ -0,0 +1,29 @@
+import numpy as np
+
+PRICE_FEATURES = ["carat", "depth", "x", "y", "z"]
+RECOMMEND_FEATURES = ["price", "carat", "depth", "x", "y", "z"]
+
+
+def depth_ratio(length, width, depth, scale=100, decimals=1):
+    """feature_5: depth over mean girdle diameter, 0 where length and width are both 0."""
+    length = np.asarray(length, dtype=float)
+    width = np.asarray(width, dtype=float)
+    depth = np.asarray(depth, dtype=float)
+    mean = (length + width) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(mean != 0, depth / mean * scale, 0.0)
+    if decimals is not None:
+        ratio = np.round(ratio, decimals)
+    return ratio
+
+
+def price_matrix(carat, length, width, depth, ratio=None):
+    if ratio is None:
+        ratio = depth_ratio(length, width, depth)
+    return np.column_stack(np.broadcast_arrays(carat, ratio, length, width, depth)).astype(float)
+
+
+def recommend_matrix(price, carat, length, width, depth, ratio=None):
+    if ratio is None:
+        ratio = depth_ratio(length, width, depth)
+    return np.column_stack(np.broadcast_arrays(price, carat, ratio, length, width, depth)).astype(float)
@@ -0,0 +1,101 @@
+"""Observe the elements a Streamlit script sends, for profiling and benchmarks.
+
+    def on_element(delta_type, element_proto, start, end, media_bytes):
+        ...
+
+    token = element_hook.subscribe(on_element, session_id)
+    ...
+    element_hook.unsubscribe(token)
+
+DeltaGenerator._enqueue is wrapped only while somebody is subscribed and
+restored when the last subscriber leaves, so an app that nobody observes
+runs unpatched. A listener subscribed with a session id only hears about
+elements sent by that session's script thread; with session_id=None it hears
+every element in the process (what a single-session AppTest run wants).
+
+start and end bracket the _enqueue call itself (marshalling the element and
+queueing it). Images travel as media files next to a URL in the proto, so
+MediaFileManager.add is wrapped too, and the bytes uploaded on a thread are
+reported with the next element that thread enqueues.
+"""
+import threading
+import time
+
+CHART_TYPES = {"plotly_chart", "imgs", "vega_lite_chart", "deck_gl_json_chart", "bokeh_chart"}
+
+_lock = threading.Lock()
+# (session id or None, listener) pairs; replaced, never mutated, so readers need no lock.
+_subscribers = ()
+_originals = None
+_media = threading.local()
+
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def _listeners():
+    subscribers = _subscribers
+    if any(session is not None for session, _ in subscribers):
+        current = _session_id()
+        return [listener for session, listener in subscribers if session is None or session == current]
+    return [listener for _, listener in subscribers]
+
+
+def _install():
+    global _originals
+    from streamlit.delta_generator import DeltaGenerator
+    from streamlit.runtime.media_file_manager import MediaFileManager
+
+    _originals = enqueue, add = DeltaGenerator._enqueue, MediaFileManager.add
+
+    def _enqueue(dg, delta_type, element_proto, *args, **kwargs):
+        listeners = _listeners()
+        if not listeners:
+            return enqueue(dg, delta_type, element_proto, *args, **kwargs)
+        start = time.perf_counter()
+        result = enqueue(dg, delta_type, element_proto, *args, **kwargs)
+        end = time.perf_counter()
+        media, _media.bytes = getattr(_media, "bytes", 0), 0
+        for listener in listeners:
+            listener(delta_type, element_proto, start, end, media)
+        return result
+
+    def _add(mgr, path_or_data, *args, **kwargs):
+        if isinstance(path_or_data, bytes) and _listeners():
+            _media.bytes = getattr(_media, "bytes", 0) + len(path_or_data)
+        return add(mgr, path_or_data, *args, **kwargs)
+
+    DeltaGenerator._enqueue = _enqueue
+    MediaFileManager.add = _add
+
+
+def _uninstall():
+    global _originals
+    from streamlit.delta_generator import DeltaGenerator
+    from streamlit.runtime.media_file_manager import MediaFileManager
+
+    DeltaGenerator._enqueue, MediaFileManager.add = _originals
+    _originals = None
+
+
+def subscribe(listener, session_id=None):
+    """Start calling listener for every element; returns the token for unsubscribe()."""
+    global _subscribers
+    token = (session_id, listener)
+    with _lock:
+        if _originals is None:
+            _install()
+        _subscribers = _subscribers + (token,)
+    return token
+
+
+def unsubscribe(token):
+    global _subscribers
+    with _lock:
+        _subscribers = tuple(s for s in _subscribers if s is not token)
+        if not _subscribers and _originals is not None:
+            _uninstall()
@@ -0,0 +1,27 @@
+import functools
+
+import streamlit as st
+
+from figure_payload import prepare
+
+
+def cached_figure(builder=None, *, max_entries=128):
+    """Memoize a figure builder on its arguments, shared by every session.
+
+    The figure is run through figure_payload.prepare() once, before it is
+    cached. st.plotly_chart serializes the figure it is given without mutating
+    it, so the cached Figure can be handed out as-is. Callers must not modify it.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def build(*args, **kwargs):
+            return prepare(fn(*args, **kwargs))
+
+        return st.cache_resource(max_entries=max_entries, show_spinner=False)(build)
+
+    return wrap(builder) if builder is not None else wrap
+
+
+def lazy_expander(label, key, expanded=False):
+    """An expander whose .open is True only while it is expanded, so its body can be skipped."""
+    return st.expander(label, expanded=expanded, key=key, on_change="rerun")
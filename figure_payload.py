@@ -0,0 +1,114 @@
+"""Shrink plotly figures before they are sent to the browser.
+
+plotly serializes float and int NumPy arrays as base64 typed buffers
+({"dtype": "f8", "bdata": ...}), but Python lists still go out as JSON
+number lists and datetime64 arrays as ISO strings (about 22 bytes a value).
+prepare() turns both into typed arrays. Dates become float64 milliseconds
+since the epoch and their axis is set to type "date", which plotly.js reads
+natively. Hover labels and tick formats are unchanged.
+
+Traces with more than GL_THRESHOLD points (PLOTLY_GL_THRESHOLD, default
+10,000) are also switched to their WebGL variant, e.g. scatter to scattergl.
+Animation frames follow the trace they target, so plotly.animate still sees
+matching types. A trace that uses a feature its gl variant lacks (stacking,
+spline lines, ...) keeps SVG rendering.
+
+    from figure_payload import plotly_chart
+    plotly_chart(fig, use_container_width=True)
+
+Figures built through figure_cache.cached_figure are prepared once when
+cached, so plotly_chart passes them through untouched.
+"""
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+GL_THRESHOLD = int(os.environ.get("PLOTLY_GL_THRESHOLD", 10_000))
+GL_TYPES = {"scatter": go.Scattergl, "scatterpolar": go.Scatterpolargl}
+# Properties scattergl does not support; a trace using any of them stays SVG.
+SVG_ONLY = ("stackgroup", "fillpattern", "cliponaxis", "groupnorm", "stackgaps")
+DATA_KEYS = ("x", "y", "z", "r", "open", "high", "low", "close")
+
+
+def points(trace):
+    lengths = [len(trace[k]) for k in DATA_KEYS if isinstance(trace.get(k), (list, tuple, np.ndarray))]
+    return max(lengths, default=0)
+
+
+def _to_gl(trace):
+    props = {k: v for k, v in trace.items() if k != "type"}
+    if any(k in props for k in SVG_ONLY) or props.get("line", {}).get("shape") in ("spline", "hvh", "vhv"):
+        return None
+    try:
+        return GL_TYPES[trace["type"]](props)
+    except ValueError:
+        return None
+
+
+def _axis(layout, trace, letter):
+    if "scene" in trace or trace.get("type") in ("scatter3d", "surface", "mesh3d"):
+        return layout.setdefault(trace.get("scene", "scene"), {}).setdefault(f"{letter}axis", {})
+    if trace.get("type") not in ("scatter", "scattergl", "bar", "box", "violin", "histogram", "heatmap",
+                                 "candlestick", "ohlc", "contour"):
+        return None
+    ref = trace.get(f"{letter}axis", letter)
+    return layout.setdefault(ref.replace(letter, f"{letter}axis", 1), {})
+
+
+def _encode(trace, layout):
+    for key in DATA_KEYS:
+        value = trace.get(key)
+        if isinstance(value, (list, tuple)) and value:
+            array = np.asarray(value)
+            if array.dtype.kind in "iuf":
+                trace[key] = array
+        elif isinstance(value, np.ndarray) and value.dtype.kind == "M" and key in "xyz":
+            axis = _axis(layout, trace, key)
+            if axis is None or axis.get("type") not in (None, "date"):
+                continue
+            ms = value.astype("datetime64[ms]")
+            out = ms.astype(np.int64).astype(np.float64)
+            out[np.isnat(ms)] = np.nan
+            trace[key] = out
+            axis["type"] = "date"
+    return trace
+
+
+def prepare(fig, gl_threshold=None):
+    """A copy of fig with binary-encodable arrays and WebGL traces for large series."""
+    threshold = GL_THRESHOLD if gl_threshold is None else gl_threshold
+    spec = fig.to_dict()
+    layout = spec.setdefault("layout", {})
+
+    converted = set()
+    for i, trace in enumerate(spec["data"]):
+        if trace.get("type", "scatter") in GL_TYPES and points(trace) > threshold:
+            trace.setdefault("type", "scatter")
+            gl = _to_gl(trace)
+            if gl is not None:
+                spec["data"][i] = gl.to_plotly_json()
+                converted.add(i)
+        _encode(spec["data"][i], layout)
+
+    for frame in spec.get("frames", []):
+        targets = frame.get("traces") or range(len(frame.get("data", [])))
+        for j, (target, trace) in enumerate(zip(targets, frame.get("data", []))):
+            if target in converted and trace.get("type", "scatter") in GL_TYPES:
+                trace.setdefault("type", "scatter")
+                gl = _to_gl(trace)
+                if gl is not None:
+                    frame["data"][j] = trace = gl.to_plotly_json()
+            _encode(trace, layout)
+
+    prepared = go.Figure(spec, skip_invalid=False)
+    prepared._payload_prepared = True
+    return prepared
+
+
+def plotly_chart(fig, **kwargs):
+    import streamlit as st
+
+    if not getattr(fig, "_payload_prepared", False):
+        fig = prepare(fig)
+    return st.plotly_chart(fig, **kwargs)
@@ -0,0 +1,113 @@
+"""Cleaned Google Play store data, shared by the Gplay notebooks and dashboards.
+
+    from gplay_data import load_clean
+    inp1 = load_clean("googleplaystore_v2.csv")
+
+The first call cleans the CSV and writes a Parquet cache next to it; later
+calls read the cache unless the CSV has changed since.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+CSV_DTYPES = {
+    "App": "string",
+    "Category": "string",
+    "Rating": "float64",
+    "Reviews": "string",
+    "Size": "float64",
+    "Installs": "string",
+    "Type": "string",
+    "Price": "string",
+    "Content Rating": "string",
+    "Genres": "string",
+    "Last Updated": "string",
+    "Current Ver": "string",
+    "Android Ver": "string",
+}
+CATEGORICAL = ["Category", "Type", "Content Rating", "Genres", "Android Ver"]
+DROPPED_CONTENT_RATINGS = ["Adults only 18+", "Unrated"]
+
+
+def read_raw(path):
+    return pd.read_csv(path, dtype=CSV_DTYPES)
+
+
+def clean(inp0):
+    """The cleaning steps from "Gplay Analysis.ipynb", vectorized."""
+    inp1 = inp0[inp0["Rating"].notna()]
+    # One row is shifted one column to the left; it is the only null Android Ver with Category "1.9".
+    inp1 = inp1[~(inp1["Android Ver"].isna() & (inp1["Category"] == "1.9"))].copy()
+
+    inp1["Android Ver"] = inp1["Android Ver"].fillna(inp1["Android Ver"].mode()[0])
+    inp1["Current Ver"] = inp1["Current Ver"].fillna(inp1["Current Ver"].mode()[0])
+
+    inp1["Price"] = pd.to_numeric(inp1["Price"].str.lstrip("$")).astype("float64")
+    inp1["Reviews"] = inp1["Reviews"].astype("int32")
+    inp1["Installs"] = inp1["Installs"].str.replace(r"[,+]", "", regex=True).astype("int64")
+
+    keep = (
+        (inp1["Reviews"] <= inp1["Installs"])
+        & (inp1["Price"] <= 30)
+        & (inp1["Reviews"] <= 1000000)
+        & (inp1["Installs"] <= 100000000)
+        & ~inp1["Content Rating"].isin(DROPPED_CONTENT_RATINGS)
+    )
+    inp1 = inp1[keep].reset_index(drop=True)
+
+    inp1["Last Updated"] = pd.to_datetime(inp1["Last Updated"])
+    inp1["updated_month"] = inp1["Last Updated"].dt.month.astype("int8")
+    for col in CATEGORICAL:
+        inp1[col] = inp1[col].astype("category")
+    for col in ["App", "Current Ver"]:
+        inp1[col] = inp1[col].astype(object)
+    return inp1
+
+
+def cache_path_for(csv_path):
+    return os.path.splitext(csv_path)[0] + ".clean.parquet"
+
+
+def load_clean(csv_path, cache_path=None, refresh=False):
+    cache_path = cache_path or cache_path_for(csv_path)
+    if (not refresh and os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(csv_path)):
+        return pd.read_parquet(cache_path)
+
+    inp1 = clean(read_raw(csv_path))
+    tmp = cache_path + ".tmp"
+    inp1.to_parquet(tmp, index=False)
+    os.replace(tmp, cache_path)
+    return inp1
+
+
+def monthly_installs(inp1):
+    return inp1.pivot_table(values="Installs", index="updated_month", columns="Content Rating",
+                            aggfunc="sum", observed=True)
+
+
+def monthly_share(monthly):
+    """Each month's installs as a share of that month's total."""
+    return monthly.div(monthly.sum(axis=1), axis=0)
+
+
+def size_buckets(inp1):
+    return pd.qcut(inp1["Size"], [0, 0.2, 0.4, 0.6, 0.8, 1], ["VL", "L", "M", "H", "VH"])
+
+
+def rating_by_size(inp1, q=0.2):
+    return inp1.assign(Size_Bucket=size_buckets(inp1)).pivot_table(
+        index="Content Rating", columns="Size_Bucket", values="Rating",
+        aggfunc=lambda x: np.quantile(x, q), observed=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean googleplaystore_v2.csv and cache it as Parquet.")
+    parser.add_argument("csv")
+    parser.add_argument("--cache", help="Parquet path (default: <csv>.clean.parquet)")
+    args = parser.parse_args()
+
+    df = load_clean(args.csv, args.cache, refresh=True)
+    print(f"{len(df)} rows -> {args.cache or cache_path_for(args.csv)}")
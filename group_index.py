@@ -0,0 +1,36 @@
+import threading
+
+import pandas as pd
+
+
+class GroupIndex:
+    """Row positions of every value of one column, computed with a single groupby.
+
+    Looking up a key costs a dict access; the sub-frame for a key is taken once
+    and then shared, so treat it as read-only.
+    """
+
+    def __init__(self, df, column):
+        self.df = df
+        self.column = column
+        self.keys = list(pd.unique(df[column]))
+        self.positions = df.groupby(column, sort=False, observed=True).indices
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        frame = self._frames.get(key)
+        if frame is None:
+            with self._lock:
+                frame = self._frames.get(key)
+                if frame is None:
+                    rows = self.positions.get(key)
+                    frame = self.df.iloc[:0] if rows is None else self.df.take(rows)
+                    self._frames[key] = frame
+        return frame
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def __len__(self):
+        return len(self.keys)
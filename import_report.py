@@ -0,0 +1,90 @@
+"""Import-time breakdown for the Streamlit entry points.
+
+Runs each entry point's top-level imports in a fresh interpreter under
+`python -X importtime` and reports the cumulative time of every top-level
+package, best of --repeat runs.
+
+    python import_report.py                      # table for every entry point
+    python import_report.py Poly_mod.py --json import_times.json
+    python import_report.py --forbid matplotlib seaborn sklearn
+
+--forbid exits non-zero if any listed package is imported at start-up, so it
+can guard the lazy-loading in CI.
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTRY_POINTS = ["Dash2.py", "Dashboard.py", "Poly_mod.py", "Predictor.py"]
+
+
+def top_level_imports(path):
+    """Source of the module-level import statements in a script."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def importtime(code, cwd=ROOT):
+    """{module: cumulative seconds} for every module imported by code."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd,
+                          capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is shown by indenting the name; only keep what the script itself pulled in.
+        if not name[1:].startswith(" "):
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def all_modules(code, cwd=ROOT):
+    proc = subprocess.run([sys.executable, "-c", code + "\nimport sys\nprint('\\n'.join(sys.modules))"],
+                          cwd=cwd, capture_output=True, text=True, check=True)
+    return {name.split(".")[0] for name in proc.stdout.split()}
+
+
+def report(entry, repeat=3):
+    code = top_level_imports(os.path.join(ROOT, entry))
+    # Interpreter start-up (site, encodings, ...) is the same for every script.
+    startup = importtime("pass")
+    runs = [{k: v for k, v in importtime(code).items() if k not in startup} for _ in range(repeat)]
+    modules = {name: min(run.get(name, float("inf")) for run in runs) for name in runs[0]}
+    return {
+        "total_s": round(min(sum(run.values()) for run in runs), 4),
+        "modules": {k: round(v, 4) for k, v in sorted(modules.items(), key=lambda kv: -kv[1])},
+        "packages": sorted(all_modules(code)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report import time of the app entry points.")
+    parser.add_argument("entries", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--forbid", nargs="*", default=[], help="packages that must not load at start-up")
+    args = parser.parse_args()
+
+    results = {entry: report(entry, args.repeat) for entry in args.entries}
+    for entry, result in results.items():
+        print(f"{entry}: {result['total_s'] * 1000:.0f} ms")
+        for name, seconds in result["modules"].items():
+            print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(), "entries": results}, f, indent=2)
+
+    loaded = {entry: sorted(set(args.forbid) & set(r["packages"])) for entry, r in results.items()}
+    loaded = {entry: names for entry, names in loaded.items() if names}
+    if loaded:
+        for entry, names in loaded.items():
+            print(f"{entry} imports {', '.join(names)} at start-up", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,207 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from diamond_features import depth_ratio, price_matrix, recommend_matrix
+from model_registry import get_local_model
+
+
+class Percentiles:
+    def __init__(self, scale=1000, suffix="_ms", window=10_000):
+        self.scale = scale
+        self.suffix = suffix
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def record(self, value):
+        with self.lock:
+            self.samples.append(value)
+            self.count += 1
+
+    def summary(self):
+        with self.lock:
+            samples = np.array(self.samples)
+            count = self.count
+        if not len(samples):
+            return {"count": count, f"p50{self.suffix}": None, f"p99{self.suffix}": None}
+        p50, p99 = np.percentile(samples, [50, 99]) * self.scale
+        return {"count": count, f"p50{self.suffix}": round(p50, 3), f"p99{self.suffix}": round(p99, 3)}
+
+
+class MicroBatcher:
+    """Collects rows from concurrent callers and scores them with one predict call.
+
+    A batch is flushed when max_batch rows are waiting or window_ms has passed
+    since the first row arrived, whichever comes first.
+    """
+
+    def __init__(self, predict, window_ms=5, max_batch=512):
+        self.predict = predict
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pending = queue.Queue()
+        self.batch_sizes = Percentiles(scale=1, suffix="")
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, row):
+        future = Future()
+        self.pending.put((row, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self.pending.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            rows, futures = zip(*batch)
+            self.batch_sizes.record(len(batch))
+            try:
+                preds = self.predict(np.vstack(rows))
+                if len(preds) != len(futures):
+                    raise ValueError(f"{len(preds)} predictions for {len(futures)} requests")
+            except Exception:
+                # Score the rows one by one so only the request that broke the batch fails.
+                for row, f in batch:
+                    try:
+                        f.set_result(self.predict(row)[0])
+                    except Exception as e:
+                        f.set_exception(e)
+                continue
+            for f, p in zip(futures, preds):
+                f.set_result(p)
+
+
+def _features(body, names):
+    """body's values for names as floats; each must be a single finite number.
+
+    A list would broadcast into several rows and shift every later
+    prediction in the batch onto the wrong request; json.loads also accepts
+    NaN and Infinity, which would only fail later, inside a batch.
+    """
+    values = []
+    for name in names:
+        value = body[name]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f"{name} must be a number")
+        if not np.isfinite(value):
+            raise ValueError(f"{name} must be a finite number")
+        values.append(float(value))
+    return values
+
+
+def _one_row(matrix):
+    if matrix.shape[0] != 1:
+        raise ValueError(f"expected one row, got {matrix.shape[0]}")
+    return matrix
+
+
+def price_row(body):
+    carat, length, width, depth = _features(body, ["carat", "length", "width", "depth"])
+    ratio = depth_ratio(length, width, depth)
+    if ratio == 0:
+        raise ValueError("length and width cannot both be zero")
+    return _one_row(price_matrix(carat, length, width, depth, ratio))
+
+
+def recommend_row(body):
+    price, carat, length, width, depth = _features(body, ["price", "carat", "length", "width", "depth"])
+    ratio = depth_ratio(length, width, depth)
+    if ratio == 0:
+        raise ValueError("length and width cannot both be zero")
+    return _one_row(recommend_matrix(price, carat, length, width, depth, ratio))
+
+
+def make_handler(price_batcher, recommend_batcher, latency):
+    routes = {
+        "/price": (price_batcher, price_row, lambda p: {"price": round(abs(float(p)))}),
+        "/recommend": (recommend_batcher, recommend_row, lambda p: {"buy": bool(p == 1)}),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send(200, {path: latency[path].summary() for path in routes} |
+                           {"batch_size": {path: routes[path][0].batch_sizes.summary() for path in routes}})
+            elif self.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path not in routes:
+                self._send(404, {"error": "not found"})
+                return
+            start = time.perf_counter()
+            batcher, to_row, to_json = routes[self.path]
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                row = to_row(body)
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {"error": f"invalid input: {e}"})
+                return
+            try:
+                result = to_json(batcher.submit(row).result())
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+                return
+            latency[self.path].record(time.perf_counter() - start)
+            self._send(200, result)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class InferenceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def make_server(host="127.0.0.1", port=8000, window_ms=5, max_batch=512):
+    linear_mod = get_local_model("linear_model.joblib")
+    logistic_mod = get_local_model("logistic_model.joblib")
+    price_batcher = MicroBatcher(linear_mod.predict, window_ms, max_batch)
+    recommend_batcher = MicroBatcher(logistic_mod.predict, window_ms, max_batch)
+    latency = {"/price": Percentiles(), "/recommend": Percentiles()}
+    return InferenceServer((host, port), make_handler(price_batcher, recommend_batcher, latency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the diamond price and recommendation models over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--window-ms", type=float, default=5, help="how long to wait to fill a batch")
+    parser.add_argument("--max-batch", type=int, default=512)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.window_ms, args.max_batch)
+    print(f"Serving on http://{args.host}:{args.port} (POST /price, POST /recommend, GET /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,194 @@
+"""Download model artifacts without making a rerun wait on the network.
+
+    fetcher = ModelFetcher()
+    path = fetcher.get(url, "poly_model.joblib")
+
+get() returns the cached file straight away whenever there is one. Only the
+very first download of a file blocks, and concurrent callers share it. Each
+file then gets a daemon thread that revalidates it every refresh seconds
+(MODEL_REFRESH_SECONDS, default 3600; 0 turns refreshing off). Revalidation
+is a conditional GET carrying the ETag/Last-Modified of the cached copy, so
+an unchanged model costs a 304 and no body.
+
+Downloads are streamed to a temporary file next to the target, checked
+against Content-Length, and os.replace()d into place, so readers (and
+model_registry's mtime check) only ever see a complete file. The validators
+live in a <file>.http.json sidecar.
+
+All requests share one pooled requests.Session with retries and
+(connect, read) timeouts; pass session= to substitute one, e.g. in tests.
+
+Predictor.py loads the models shipped in Model/ and only comes here when
+that directory is missing or MODEL_SOURCE=remote is set.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+REFRESH_ENV = "MODEL_REFRESH_SECONDS"
+TIMEOUT = (3.05, 30)
+CHUNK_BYTES = 1 << 16
+
+log = logging.getLogger("model_fetch")
+
+
+def make_session(pool_size=4, retries=2):
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504),
+                  allowed_methods=frozenset(["GET"]))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _meta_path(path):
+    return path + ".http.json"
+
+
+def read_meta(path):
+    try:
+        with open(_meta_path(path)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".meta.")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class ModelFetcher:
+    def __init__(self, refresh=None, timeout=TIMEOUT, session=None):
+        if refresh is None:
+            refresh = float(os.environ.get(REFRESH_ENV, 3600))
+        self.refresh = refresh
+        self.timeout = timeout
+        self.session = session or make_session()
+        self._lock = threading.Lock()
+        self._path_locks = {}
+        self._threads = {}
+        self._stop = threading.Event()
+
+    def _path_lock(self, path):
+        with self._lock:
+            return self._path_locks.setdefault(path, threading.RLock())
+
+    def fetch(self, url, path):
+        """Download url to path unless the cached copy is still current; True if the file changed.
+
+        Raises requests.RequestException, ValueError on a truncated body, or
+        OSError when the file cannot be written, and leaves any existing file
+        untouched.
+        """
+        path = os.path.abspath(path)
+        with self._path_lock(path):
+            meta = read_meta(path) if os.path.exists(path) else {}
+            headers = {}
+            if meta.get("url") == url:
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+
+            with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304:
+                    meta["checked"] = time.time()
+                    _write_json(_meta_path(path), meta)
+                    return False
+                response.raise_for_status()
+
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.")
+                try:
+                    size = 0
+                    with os.fdopen(fd, "wb") as f:
+                        for chunk in response.iter_content(CHUNK_BYTES):
+                            f.write(chunk)
+                            size += len(chunk)
+                    expected = response.headers.get("Content-Length")
+                    if expected is not None and "Content-Encoding" not in response.headers and int(expected) != size:
+                        raise ValueError(f"Truncated download from {url}: {size} of {expected} bytes")
+                    os.replace(tmp, path)
+                except BaseException:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                    raise
+
+            _write_json(_meta_path(path), {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "checked": time.time(),
+                "bytes": size,
+            })
+            log.info("downloaded %s -> %s (%d bytes)", url, path, size)
+            return True
+
+    def get(self, url, path):
+        """path, downloading it first only if there is no cached copy yet."""
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            with self._path_lock(path):
+                # Callers that waited on the lock find the file another one downloaded.
+                if not os.path.exists(path):
+                    self.fetch(url, path)
+        self._watch(url, path)
+        return path
+
+    def _watch(self, url, path):
+        if not self.refresh:
+            return
+        with self._lock:
+            if path in self._threads:
+                return
+            thread = threading.Thread(target=self._refresh_loop, args=(url, path), daemon=True,
+                                      name=f"model-refresh-{os.path.basename(path)}")
+            self._threads[path] = thread
+        thread.start()
+
+    def _refresh_loop(self, url, path):
+        while True:
+            # Wait out whatever is left of the interval since the last check,
+            # which may have been made by an earlier process.
+            checked = read_meta(path).get("checked", 0)
+            if self._stop.wait(max(0.0, checked + self.refresh - time.time())):
+                return
+            try:
+                self.fetch(url, path)
+            except (requests.RequestException, ValueError, OSError) as e:
+                log.warning("refreshing %s failed, keeping the cached copy: %s", path, e)
+                if self._stop.wait(self.refresh):
+                    return
+
+    def close(self):
+        self._stop.set()
+        for thread in list(self._threads.values()):
+            thread.join(timeout=5)
+        self.session.close()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_fetcher():
+    """One fetcher (session, refresh threads) per process."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ModelFetcher()
+        return _default
+
+
+def fetch_model(url, path):
+    return default_fetcher().get(url, path)
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Model")
+
+_lock = threading.Lock()
+_models = {}
+_stats = {}
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def local_path(name):
+    return os.path.join(MODEL_DIR, name)
+
+
+def compact_path(path):
+    """The compact .npz export next to a .joblib/.pkl artifact, if there is one."""
+    base, ext = os.path.splitext(path)
+    if ext in (".joblib", ".pkl") and os.path.exists(base + ".npz"):
+        return base + ".npz"
+    return path
+
+
+def _load(path, digest):
+    # .npz artifacts are scored with NumPy alone, so scikit-learn is never imported for them.
+    if path.endswith(".npz"):
+        import shared_store
+        from compact_models import from_arrays, load_compact, read_arrays
+
+        if not shared_store.enabled():
+            return load_compact(path)
+        # Every worker maps the same coefficient files instead of holding its own copy.
+        key = "model_" + os.path.splitext(os.path.basename(path))[0]
+        arrays, meta = shared_store.get_or_build_arrays(key, digest[:16], lambda: read_arrays(path))
+        return from_arrays(arrays, meta, path)
+    from joblib import load
+    return load(path)
+
+
+def get_model(path, sha256=None):
+    """Load a joblib or compact .npz artifact once per process, keyed by path and content hash."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    signature = (st.st_mtime_ns, st.st_size)
+
+    with _lock:
+        # A stat() is all a cache hit costs; the file is only re-read and
+        # re-hashed when it has changed on disk.
+        if _stats.get(path, (None, None))[0] == signature:
+            digest = _stats[path][1]
+            if sha256 is None or sha256 == digest:
+                return _models[(path, digest)]
+
+        digest = file_sha256(path)
+        if sha256 is not None and sha256 != digest:
+            raise ValueError(f"Checksum mismatch for {path}: expected {sha256}, got {digest}")
+
+        key = (path, digest)
+        if key not in _models:
+            old = _stats.get(path)
+            if old is not None:
+                _models.pop((path, old[1]), None)
+            _models[key] = _load(path, digest)
+        _stats[path] = (signature, digest)
+        return _models[key]
+
+
+def get_local_model(name, sha256=None):
+    """Model/<name>, or its compact export when there is one (unless a checksum pins the exact file)."""
+    path = local_path(name)
+    return get_model(path if sha256 is not None else compact_path(path), sha256=sha256)
+
+
+def invalidate(path=None):
+    with _lock:
+        if path is None:
+            _models.clear()
+            _stats.clear()
+            return
+        path = os.path.abspath(path)
+        old = _stats.pop(path, None)
+        if old is not None:
+            _models.pop((path, old[1]), None)
+
+
+def loaded_models():
+    with _lock:
+        return {path: digest for path, (_, digest) in _stats.items()}
@@ -0,0 +1,77 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+MAX_ENTRIES = 32
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+# rcParams (and therefore style contexts) are process-global, so drawing is
+# serialized. Cache hits never take this lock.
+_render_lock = threading.Lock()
+
+
+def _fingerprint(h, value):
+    if isinstance(value, np.ndarray):
+        h.update(str((value.dtype, value.shape)).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}{len(value)}".encode())
+        for v in value:
+            _fingerprint(h, v)
+    elif isinstance(value, dict):
+        for k in sorted(value):
+            _fingerprint(h, k)
+            _fingerprint(h, value[k])
+    else:
+        h.update(repr(value).encode())
+
+
+def render_key(draw, args, options):
+    h = hashlib.sha256(f"{draw.__module__}.{draw.__qualname__}".encode())
+    _fingerprint(h, args)
+    _fingerprint(h, options)
+    return h.hexdigest()
+
+
+def render(draw, *args, fmt="png", style=None, figsize=(6.4, 4.8), dpi=100):
+    """Draw with draw(fig, *args) on a pyplot-free Agg figure and return the image bytes.
+
+    Output is cached by a hash of the draw function, its arguments and the
+    render options, with LRU eviction after MAX_ENTRIES images. The figure is
+    discarded as soon as it has been saved.
+    """
+    key = render_key(draw, args, (fmt, style, figsize, dpi))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    import matplotlib.style
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    with _render_lock:
+        with matplotlib.style.context(style or "default"):
+            fig = Figure(figsize=figsize, dpi=dpi)
+            FigureCanvasAgg(fig)
+            draw(fig, *args)
+            buf = io.BytesIO()
+            fig.savefig(buf, format=fmt)
+            fig.clear()
+    data = buf.getvalue()
+
+    with _cache_lock:
+        _cache[key] = data
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return data
+
+
+def clear():
+    with _cache_lock:
+        _cache.clear()
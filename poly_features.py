@@ -0,0 +1,102 @@
+from functools import lru_cache
+from itertools import combinations_with_replacement
+
+import numpy as np
+
+from model_registry import get_model
+
+
+@lru_cache(maxsize=None)
+def exponent_table(n_features, degree, include_bias=True):
+    """Exponents in the same column order as sklearn's PolynomialFeatures.powers_."""
+    rows = []
+    for d in range(0 if include_bias else 1, degree + 1):
+        for combo in combinations_with_replacement(range(n_features), d):
+            row = [0] * n_features
+            for i in combo:
+                row[i] += 1
+            rows.append(row)
+    table = np.array(rows, dtype=np.int64)
+    table.setflags(write=False)
+    return table
+
+
+def infer_degree(n_terms, n_features, include_bias=True, max_degree=10):
+    """The degree whose expansion of n_features has n_terms columns."""
+    for degree in range(1, max_degree + 1):
+        if len(exponent_table(n_features, degree, include_bias)) == n_terms:
+            return degree
+    raise ValueError(f"No polynomial degree of {n_features} features gives {n_terms} terms")
+
+
+def expand(X, powers):
+    """Polynomial terms in exponent_table order.
+
+    Each degree-d column is a degree-(d-1) column times one feature, built in
+    the same order as sklearn's PolynomialFeatures so the terms match it bit
+    for bit.
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    n = X.shape[1]
+    degree = int(powers.sum(axis=1).max())
+    XP = np.empty((X.shape[0], len(powers)))
+    col = 0
+    if not powers[0].any():
+        XP[:, 0] = 1
+        col = 1
+    XP[:, col:col + n] = X
+    index = list(range(col, col + n + 1))
+    col += n
+    for _ in range(2, degree + 1):
+        new_index = []
+        end = index[-1]
+        for j in range(n):
+            start = index[j]
+            new_index.append(col)
+            np.multiply(XP[:, start:end], X[:, j:j + 1], out=XP[:, col:col + end - start])
+            col += end - start
+        new_index.append(col)
+        index = new_index
+    return XP
+
+
+class PolynomialModel:
+    """A fitted linear model on degree-N polynomial terms, scored on raw features."""
+
+    def __init__(self, linear, n_features, degree, include_bias=True):
+        self.linear = linear
+        self.degree = degree
+        self.powers = exponent_table(n_features, degree, include_bias)
+        self.coef = np.ravel(linear.coef_)
+        self.intercept = float(np.ravel(linear.intercept_)[0])
+        if self.coef.shape[0] != self.powers.shape[0]:
+            raise ValueError(
+                f"Model has {self.coef.shape[0]} coefficients, expected {self.powers.shape[0]} "
+                f"for {n_features} features at degree {degree}")
+
+    def transform(self, X):
+        return expand(X, self.powers)
+
+    def predict(self, X):
+        return self.transform(X) @ self.coef + self.intercept
+
+
+_poly_models = {}
+
+
+def get_polynomial_model(path, n_features=5, degree=None):
+    """degree=None reads it off the coefficient count, so a retrained model of another degree just works."""
+    linear = get_model(path)
+    if getattr(linear, "powers", None) is not None:
+        # A compact polynomial export already expands its own inputs.
+        return linear
+    key = (path, n_features, degree)
+    entry = _poly_models.get(key)
+    # Rebuild only if the registry handed back a different (reloaded) model.
+    if entry is None or entry.linear is not linear:
+        n_terms = np.size(linear.coef_)
+        entry = _poly_models[key] = PolynomialModel(
+            linear, n_features, degree or infer_degree(n_terms, n_features))
+    return entry
@@ -0,0 +1,114 @@
+"""Every price Poly_mod's sliders can produce, computed ahead of time.
+
+The sliders only take carat 0.0-10.0 in 0.1 steps and length/width/depth
+0-40, so the linear model's predicted price is a lookup into a
+101 x 41 x 41 x 41 float32 array (about 28 MB). Each cell holds the rounded
+absolute price the app would show, or NaN where the depth ratio is 0 and the
+app refuses to predict.
+
+    python price_grid.py        # writes Model/price_grid.npy and price_grid.json
+
+The JSON records the sha256 of the model file the grid was built from;
+get_grid() returns None when that no longer matches, so the app falls back
+to live inference until the grid is rebuilt.
+"""
+import argparse
+import json
+import os
+import threading
+
+import numpy as np
+
+from diamond_features import depth_ratio, price_matrix
+from model_registry import compact_path, file_sha256, get_model, local_path
+
+MODEL = "linear_model.joblib"
+GRID_PATH = local_path("price_grid.npy")
+META_PATH = local_path("price_grid.json")
+CARATS = np.round(np.arange(101) * 0.1, 1)
+DIMS = np.arange(41)
+
+_lock = threading.Lock()
+_cache = {}
+
+
+class PriceGrid:
+    def __init__(self, prices, meta):
+        self.prices = prices
+        self.meta = meta
+
+    def index(self, carat, length, width, depth):
+        """Grid coordinates of an input, or None if it is off the grid."""
+        i = round(carat * 10)
+        if not 0 <= i < len(CARATS) or abs(carat - CARATS[i]) > 1e-9:
+            return None
+        dims = (length, width, depth)
+        if any(d != int(d) or not 0 <= d < len(DIMS) for d in dims):
+            return None
+        return (i, *(int(d) for d in dims))
+
+    def price(self, carat, length, width, depth):
+        """The predicted price, NaN where the app cannot predict, or None off the grid."""
+        index = self.index(carat, length, width, depth)
+        return None if index is None else float(self.prices[index])
+
+
+def _ratios():
+    length, width, depth = (a.ravel() for a in np.meshgrid(DIMS, DIMS, DIMS, indexing="ij"))
+    raw = depth_ratio(length, width, depth, decimals=None)
+    # Poly_mod rounds with the builtin round(); np.round can differ on ties.
+    ratio = np.array([round(r, 1) for r in raw.tolist()])
+    return length, width, depth, ratio
+
+
+def build(model_path=None, grid_path=GRID_PATH, meta_path=META_PATH):
+    model_path = model_path or compact_path(local_path(MODEL))
+    model = get_model(model_path)
+    length, width, depth, ratio = _ratios()
+    invalid = ratio == 0
+
+    tmp = grid_path + ".tmp.npy"
+    grid = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(len(CARATS),) + (len(DIMS),) * 3)
+    for i, carat in enumerate(CARATS):
+        price = np.abs(model.predict(price_matrix(carat, length, width, depth, ratio))).round()
+        price[invalid] = np.nan
+        grid[i] = price.reshape(grid.shape[1:])
+    grid.flush()
+    del grid
+    os.replace(tmp, grid_path)
+
+    meta = {"model": os.path.basename(model_path), "model_sha256": file_sha256(model_path),
+            "carats": [CARATS[0], CARATS[-1], len(CARATS)], "dims": [int(DIMS[0]), int(DIMS[-1])]}
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+    return grid_path
+
+
+def get_grid(model_path=None, grid_path=GRID_PATH, meta_path=META_PATH):
+    """The memory-mapped grid for model_path, or None if it is missing or stale."""
+    model_path = os.path.abspath(model_path or compact_path(local_path(MODEL)))
+    try:
+        signature = tuple((s.st_mtime_ns, s.st_size) for s in map(os.stat, (model_path, grid_path, meta_path)))
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        # Like model_registry, a cache hit costs three stat() calls.
+        cached = _cache.get(model_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with open(meta_path) as f:
+            meta = json.load(f)
+        grid = None
+        if meta.get("model_sha256") == file_sha256(model_path):
+            grid = PriceGrid(np.load(grid_path, mmap_mode="r"), meta)
+        _cache[model_path] = (signature, grid)
+        return grid
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute the Poly_mod price grid.")
+    parser.add_argument("--model", help=f"model file (default: Model/{MODEL} or its compact export)")
+    args = parser.parse_args()
+    print(build(args.model))
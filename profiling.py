@@ -0,0 +1,268 @@
+"""Opt-in per-chart profiling for the Streamlit pages.
+
+    prof = profiling.start("Dash2")
+    ...
+    bars = bucket_to_budget(df, "Date", cols)
+    prof.mark("data")
+    fig = go.Figure(...)
+    st.plotly_chart(fig)
+    ...
+    prof.finish()
+
+Profiling is on when APP_PROFILE=1 is set or the page is opened with
+?profile=1. Otherwise start() returns a do-nothing profiler. Elements are
+observed through element_hook, subscribed for the requesting session only:
+other sessions' elements are not timed, and once no session is profiling
+Streamlit runs unpatched again.
+
+Every chart element the session sends becomes a record. The time since the
+previous chart is split at any mark()s into named phases, the rest is "figure", and the chart call itself is "render". Payload size is the
+element proto plus any image bytes it references. Records are labelled with
+the most recent title/subheader. On a fragment-only rerun, timing restarts at
+the fragment's first element, and its records go to the logs and metrics.
+
+finish() draws a sidebar table. Each record is also logged as a JSON line on
+the "app_profile" logger and added to a Prometheus text registry. Set
+APP_PROFILE_PORT to serve that registry at http://127.0.0.1:<port>/metrics.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import element_hook
+from element_hook import CHART_TYPES
+
+PROFILE_ENV = "APP_PROFILE"
+PORT_ENV = "APP_PROFILE_PORT"
+QUERY_PARAM = "profile"
+
+log = logging.getLogger("app_profile")
+
+_lock = threading.Lock()
+_server = None
+# session id -> Profiler of its latest full run; fragment reruns find it here.
+_active = weakref.WeakValueDictionary()
+# session id -> element_hook subscription of each session that asked to be profiled.
+_subscriptions = {}
+
+
+class _NullProfiler:
+    enabled = False
+
+    def mark(self, phase):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL = _NullProfiler()
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, page):
+        self.page = page
+        self.records = []
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases = {}
+        self.label = None
+        self.fragment_run = None
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def _chart(self, delta_type, start, end, payload):
+        phases = dict(self.phases, figure=start - self.last, render=end - start)
+        record = {
+            "page": self.page,
+            "chart": self.label or f"{delta_type} {len(self.records)}",
+            "type": delta_type,
+            "phases": phases,
+            "total": sum(phases.values()),
+            "bytes": payload,
+        }
+        self.records.append(record)
+        self.phases = {}
+        self.label = None
+        self.last = end
+        _metrics.observe_chart(record)
+        log.info(json.dumps(record))
+
+    def finish(self):
+        import streamlit as st
+
+        elapsed = time.perf_counter() - self.started
+        _metrics.observe_rerun(self.page, elapsed)
+        log.info(json.dumps({"page": self.page, "rerun": elapsed, "charts": len(self.records)}))
+
+        with st.sidebar.expander(f"Profile: {elapsed * 1000:.0f} ms, {len(self.records)} charts", expanded=True):
+            rows = [{
+                "chart": r["chart"],
+                **{f"{k} ms": round(v * 1000, 1) for k, v in r["phases"].items()},
+                "total ms": round(r["total"] * 1000, 1),
+                "KB": round(r["bytes"] / 1024, 1),
+            } for r in sorted(self.records, key=lambda r: -r["total"])]
+            st.dataframe(rows, hide_index=True)
+            st.download_button("Prometheus metrics", metrics_text(), file_name="metrics.txt", key="profile_metrics")
+
+
+class _Metrics:
+    """Cumulative Prometheus-style counters shared by every session in the process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seconds = defaultdict(lambda: [0.0, 0])
+        self.payload = {}
+        self.reruns = defaultdict(lambda: [0.0, 0])
+
+    def observe_chart(self, record):
+        with self.lock:
+            for phase, seconds in record["phases"].items():
+                entry = self.seconds[(record["page"], record["chart"], phase)]
+                entry[0] += seconds
+                entry[1] += 1
+            self.payload[(record["page"], record["chart"])] = record["bytes"]
+
+    def observe_rerun(self, page, seconds):
+        with self.lock:
+            entry = self.reruns[page]
+            entry[0] += seconds
+            entry[1] += 1
+
+    def text(self):
+        def esc(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+        lines = ["# TYPE app_chart_seconds summary"]
+        with self.lock:
+            for (page, chart, phase), (total, count) in sorted(self.seconds.items()):
+                labels = f'page="{esc(page)}",chart="{esc(chart)}",phase="{esc(phase)}"'
+                lines.append(f"app_chart_seconds_sum{{{labels}}} {total:.6f}")
+                lines.append(f"app_chart_seconds_count{{{labels}}} {count}")
+            lines.append("# TYPE app_chart_payload_bytes gauge")
+            for (page, chart), size in sorted(self.payload.items()):
+                lines.append(f'app_chart_payload_bytes{{page="{esc(page)}",chart="{esc(chart)}"}} {size}')
+            lines.append("# TYPE app_rerun_seconds summary")
+            for page, (total, count) in sorted(self.reruns.items()):
+                lines.append(f'app_rerun_seconds_sum{{page="{esc(page)}"}} {total:.6f}')
+                lines.append(f'app_rerun_seconds_count{{page="{esc(page)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+_metrics = _Metrics()
+
+
+def metrics_text():
+    return _metrics.text()
+
+
+def _on_element(session_id):
+    def listener(delta_type, element_proto, start, end, media):
+        prof = _active.get(session_id)
+        if prof is None:
+            return
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        if ctx is not None and ctx.fragment_ids_this_run and ctx.fragment_ids_this_run is not prof.fragment_run:
+            # A fragment-only rerun: the page's own start() did not run.
+            prof.fragment_run = ctx.fragment_ids_this_run
+            prof.last = start
+            prof.phases = {}
+            prof.label = None
+        if delta_type == "heading":
+            prof.label = element_proto.body
+        elif delta_type in CHART_TYPES:
+            prof._chart(delta_type, start, end, element_proto.ByteSize() + media)
+    return listener
+
+
+def _watch(session_id):
+    """Start observing this session's elements; idempotent."""
+    with _lock:
+        if session_id in _subscriptions:
+            return
+        _subscriptions[session_id] = element_hook.subscribe(_on_element(session_id), session_id)
+    _prune()
+
+
+def _unwatch(session_id):
+    with _lock:
+        token = _subscriptions.pop(session_id, None)
+    if token is not None:
+        element_hook.unsubscribe(token)
+
+
+def _prune():
+    """Drop the subscriptions of sessions that have since closed."""
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return
+    runtime = Runtime.instance()
+    for session_id in list(_subscriptions):
+        if not runtime.is_active_session(session_id):
+            _unwatch(session_id)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Serve metrics_text() at /metrics from a daemon thread; idempotent."""
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def enabled():
+    import streamlit as st
+
+    if os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes"):
+        return True
+    return st.query_params.get(QUERY_PARAM, "").lower() in ("1", "true", "yes")
+
+
+def start(page):
+    """A Profiler for this rerun, or NULL when profiling is off."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if not enabled():
+        if ctx is not None and ctx.session_id in _subscriptions:
+            _unwatch(ctx.session_id)
+        return NULL
+    if os.environ.get(PORT_ENV):
+        serve_metrics(int(os.environ[PORT_ENV]))
+    prof = Profiler(page)
+    if ctx is not None:
+        _active[ctx.session_id] = prof
+        _watch(ctx.session_id)
+    return prof
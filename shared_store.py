@@ -0,0 +1,229 @@
+"""A file-backed store that lets several server processes share one copy of
+the prepared data.
+
+Each entry is written once and then memory-mapped read-only by every worker,
+so the OS page cache holds a single copy however many processes read it:
+
+    <root>/<key>/CURRENT           name of the live version
+    <root>/<key>/<version>/        DataFrames, one uncompressed Arrow IPC file each,
+                                   or an array bundle: one .npy per array + meta.json
+
+A version is only ever written under a temporary name and renamed into place,
+and CURRENT is swapped with os.replace(), so a reader sees either the old or
+the new version, never a half-written one. Old versions are left on disk for
+readers that still map them; prune() removes them.
+
+    frames = shared_store.get_or_build_tables("defi", "seed42-p30-D", build)
+    arrays, meta = shared_store.get_or_build_arrays("linear_model", digest, build)
+
+Nothing is shared unless SHARED_STORE_DIR is set (see enabled()); single
+process deployments keep using the in-process caches.
+"""
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent builds are still safe, just not deduplicated
+    fcntl = None
+
+STORE_ENV = "SHARED_STORE_DIR"
+
+
+def enabled():
+    return bool(os.environ.get(STORE_ENV))
+
+
+def root():
+    return os.environ.get(STORE_ENV) or os.path.join(tempfile.gettempdir(), "ds_shared_store")
+
+
+def _key_dir(key):
+    path = os.path.join(root(), key)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@contextmanager
+def _build_lock(key):
+    """Hold an exclusive, cross-process lock on key while building it."""
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(_key_dir(key), ".lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def current_version(key):
+    try:
+        with open(os.path.join(root(), key, "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _swap(key, version):
+    directory = _key_dir(key)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".CURRENT.")
+    with os.fdopen(fd, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(directory, "CURRENT"))
+
+
+def _publish(key, version, write):
+    """Write a version under a temporary name, rename it in place and make it current."""
+    directory = _key_dir(key)
+    final = os.path.join(directory, version)
+    if not os.path.exists(final):
+        tmp = os.path.join(directory, f".{version}.{os.getpid()}.tmp")
+        write(tmp)
+        try:
+            os.rename(tmp, final)
+        except OSError:
+            # Another process published the same version first.
+            if not os.path.exists(final):
+                raise
+            shutil.rmtree(tmp)
+    _swap(key, version)
+    return final
+
+
+def put_tables(key, version, tables):
+    """Publish {name: DataFrame} as one Arrow IPC file per name.
+
+    The version is a directory of <name>.arrow files, so a set of related
+    frames is swapped in together.
+    """
+    import pyarrow as pa
+
+    def write(path):
+        os.makedirs(path)
+        for name, df in tables.items():
+            # A RangeIndex is kept as metadata only; any other index is stored as a column.
+            table = pa.Table.from_pandas(df)
+            with pa.OSFile(os.path.join(path, f"{name}.arrow"), "wb") as f:
+                with pa.ipc.new_file(f, table.schema) as writer:
+                    writer.write_table(table)
+
+    return _publish(key, version, write)
+
+
+def get_tables(key, version=None):
+    """{name: DataFrame} for a version (default: current), or None if it is missing.
+
+    Numeric and datetime columns are read-only views over the mapped file.
+    """
+    import pyarrow as pa
+
+    version = version or current_version(key)
+    if version is None:
+        return None
+    path = os.path.join(root(), key, version)
+    if not os.path.isdir(path):
+        return None
+    tables = {}
+    for file in sorted(os.listdir(path)):
+        if file.endswith(".arrow"):
+            table = pa.ipc.open_file(pa.memory_map(os.path.join(path, file))).read_all()
+            tables[file[:-len(".arrow")]] = table.to_pandas(split_blocks=True)
+    return tables
+
+
+def put_arrays(key, version, arrays, meta=None):
+    """Publish {name: ndarray} (plus a JSON-able meta dict) as .npy files."""
+    def write(path):
+        os.makedirs(path)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(array), allow_pickle=False)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta or {}, f)
+
+    return _publish(key, version, write)
+
+
+def get_arrays(key, version=None):
+    """({name: read-only memmap}, meta) for a version (default: current), or None."""
+    version = version or current_version(key)
+    if version is None:
+        return None
+    path = os.path.join(root(), key, version)
+    if not os.path.isdir(path):
+        return None
+    arrays = {file[:-len(".npy")]: np.load(os.path.join(path, file), mmap_mode="r", allow_pickle=False)
+              for file in sorted(os.listdir(path)) if file.endswith(".npy")}
+    with open(os.path.join(path, "meta.json")) as f:
+        return arrays, json.load(f)
+
+
+def _get_or_build(key, version, get, put, build):
+    found = get(key, version)
+    if found is not None:
+        if current_version(key) != version:
+            _swap(key, version)
+        return found
+    with _build_lock(key):
+        # Another worker may have finished the build while we waited.
+        found = get(key, version)
+        if found is None:
+            result = build()
+            put(key, version, *(result if isinstance(result, tuple) else (result,)))
+        elif current_version(key) != version:
+            _swap(key, version)
+    return get(key, version)
+
+
+def get_or_build_tables(key, version, build):
+    """Map key@version, building it with build() -> {name: DataFrame} if no worker has yet."""
+    return _get_or_build(key, version, get_tables, put_tables, build)
+
+
+def get_or_build_arrays(key, version, build):
+    """Map key@version, building it with build() -> (arrays, meta) if no worker has yet."""
+    return _get_or_build(key, version, get_arrays, put_arrays, build)
+
+
+def versions(key):
+    directory = os.path.join(root(), key)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if not name.startswith(".") and name != "CURRENT")
+
+
+def prune(key, keep=()):
+    """Delete every version of key except the current one and those in keep.
+
+    Workers that still map a deleted version keep reading it until they
+    unmap it; only new readers are affected.
+    """
+    current = current_version(key)
+    removed = []
+    for version in versions(key):
+        if version == current or version in keep:
+            continue
+        path = os.path.join(root(), key, version)
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(version)
+    return removed
+
+
+def disk_usage():
+    """{key: bytes on disk} across every stored version."""
+    usage = {}
+    base = root()
+    if not os.path.isdir(base):
+        return usage
+    for key in os.listdir(base):
+        total = 0
+        for directory, _, files in os.walk(os.path.join(base, key)):
+            total += sum(os.path.getsize(os.path.join(directory, f)) for f in files)
+        usage[key] = total
+    return usage
@@ -0,0 +1,172 @@
+"""Rebuild the Model/ artifacts from a diamonds CSV.
+
+    python train_models.py diamonds.csv
+
+Each model is tuned with a cross-validated grid search spread over all cores.
+The winners are written to Model/<version>/ along with a manifest.json that
+records the data hash, library versions, chosen parameters and CV scores. The
+files are then promoted to the top-level Model/ names the apps load, unless
+--no-promote is given.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy.linalg import LinAlgWarning
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.model_selection import GridSearchCV, KFold, StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import PolynomialFeatures
+
+from compact_models import export
+from diamond_features import PRICE_FEATURES, RECOMMEND_FEATURES, depth_ratio, price_matrix, recommend_matrix
+from model_registry import MODEL_DIR, file_sha256
+
+SEED = 42
+CV_FOLDS = 5
+
+# Same label as "Diamond DT 2.ipynb".
+BUY_PRICE = 4500
+BUY_CARAT = 2.9
+
+ALPHAS = [1e-6, 1e-3, 1e-1, 1, 10]
+DEGREES = [2, 3, 4]
+CS = [0.01, 0.1, 1, 10]
+
+
+def load_diamonds(path):
+    data = pd.read_csv(path)
+    data = data.drop(columns=[c for c in data.columns if c.startswith("Unnamed")])
+    data["res"] = np.where((data["price"] > BUY_PRICE) | (data["carat"] > BUY_CARAT), 1, 0)
+    return data
+
+
+def features(data, scale, decimals):
+    """The apps' input layouts, with feature_5 derived the way each app derives it."""
+    ratio = depth_ratio(data["x"], data["y"], data["z"], scale=scale, decimals=decimals)
+    price_X = price_matrix(data["carat"], data["x"], data["y"], data["z"], ratio)
+    recommend_X = recommend_matrix(data["price"], data["carat"], data["x"], data["y"], data["z"], ratio)
+    return price_X, recommend_X
+
+
+def searches(seed, cv_folds, degrees, n_jobs):
+    folds = KFold(cv_folds, shuffle=True, random_state=seed)
+    strata = StratifiedKFold(cv_folds, shuffle=True, random_state=seed)
+    return {
+        # Poly_mod.py: feature_5 as a percentage rounded to one decimal.
+        "linear_model": GridSearchCV(
+            Ridge(), {"alpha": ALPHAS}, cv=folds, scoring="neg_root_mean_squared_error", n_jobs=n_jobs),
+        # Predictor.py: raw ratio. Only the regressor is saved; the apps expand
+        # the features themselves (poly_features.py).
+        "polynomial_model": GridSearchCV(
+            Pipeline([("poly", PolynomialFeatures()), ("linear", Ridge())]),
+            {"poly__degree": degrees, "linear__alpha": ALPHAS},
+            cv=folds, scoring="neg_root_mean_squared_error", n_jobs=n_jobs),
+        "logistic_model": GridSearchCV(
+            LogisticRegression(max_iter=1000, random_state=seed), {"C": CS},
+            cv=strata, scoring="accuracy", n_jobs=n_jobs),
+    }
+
+
+def train(data, seed=SEED, cv_folds=CV_FOLDS, degrees=DEGREES, n_jobs=-1):
+    """Fit every model and return {name: (estimator, metadata)}."""
+    price_X, recommend_X = features(data, scale=100, decimals=1)
+    raw_price_X, _ = features(data, scale=1, decimals=None)
+    inputs = {
+        "linear_model": (price_X, data["price"].to_numpy(), PRICE_FEATURES),
+        "polynomial_model": (raw_price_X, data["price"].to_numpy(), PRICE_FEATURES),
+        "logistic_model": (recommend_X, data["res"].to_numpy(), RECOMMEND_FEATURES),
+    }
+
+    results = {}
+    with warnings.catch_warnings():
+        # Unscaled degree-4 terms are ill-conditioned; the alpha grid is what regularizes them.
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        warnings.simplefilter("ignore", LinAlgWarning)
+        for name, search in searches(seed, cv_folds, degrees, n_jobs).items():
+            X, y, columns = inputs[name]
+            start = time.perf_counter()
+            search.fit(X, y)
+            estimator = search.best_estimator_
+            if name == "polynomial_model":
+                estimator = estimator.named_steps["linear"]
+            results[name] = (estimator, {
+                "estimator": type(estimator).__name__,
+                "features": columns,
+                "best_params": search.best_params_,
+                "cv_score": float(search.best_score_),
+                "scoring": search.scoring,
+                "fit_seconds": round(time.perf_counter() - start, 2),
+            })
+    return results
+
+
+def save(results, version, data_path, rows, seed, cv_folds, out_dir=MODEL_DIR, promote=True):
+    version_dir = os.path.join(out_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    manifest = {
+        "version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "data": {"path": os.path.abspath(data_path), "sha256": file_sha256(data_path), "rows": rows},
+        "seed": seed,
+        "cv_folds": cv_folds,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scikit-learn": sklearn.__version__,
+        "models": {},
+    }
+    for name, (estimator, meta) in results.items():
+        filename = f"{name}.joblib"
+        path = os.path.join(version_dir, filename)
+        joblib.dump(estimator, path)
+        compact = export(estimator, os.path.join(version_dir, f"{name}.npz"), meta["features"],
+                         polynomial=name == "polynomial_model", source={"file": filename, "sha256": file_sha256(path)})
+        manifest["models"][name] = dict(meta, file=filename, sha256=file_sha256(path),
+                                        compact=os.path.basename(compact), compact_sha256=file_sha256(compact))
+
+    with open(os.path.join(version_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    if promote:
+        # Copy next to the live file and rename over it, so a running app never
+        # sees a half-written artifact.
+        files = [f for m in manifest["models"].values() for f in (m["file"], m["compact"])]
+        for filename in files + ["manifest.json"]:
+            tmp = os.path.join(out_dir, filename + ".tmp")
+            shutil.copyfile(os.path.join(version_dir, filename), tmp)
+            os.replace(tmp, os.path.join(out_dir, filename))
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrain the diamond price and recommendation models.")
+    parser.add_argument("csv", help="diamonds CSV with carat, x, y, z and price columns")
+    parser.add_argument("--out", default=MODEL_DIR)
+    parser.add_argument("--version", default=time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()))
+    parser.add_argument("--rows", type=int, help="train on the first N rows only")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--cv", type=int, default=CV_FOLDS)
+    parser.add_argument("--degrees", type=int, nargs="+", default=DEGREES)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--no-promote", action="store_true", help="only write Model/<version>/")
+    args = parser.parse_args()
+
+    data = load_diamonds(args.csv)
+    if args.rows:
+        data = data.head(args.rows)
+    results = train(data, args.seed, args.cv, args.degrees, args.n_jobs)
+    manifest = save(results, args.version, args.csv, len(data), args.seed, args.cv,
+                    args.out, promote=not args.no_promote)
+    for name, meta in manifest["models"].items():
+        print(f"{name}: {meta['best_params']} {meta['scoring']}={meta['cv_score']:.4f} ({meta['fit_seconds']}s)")
+    print(f"wrote {os.path.join(args.out, args.version)}")
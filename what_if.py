@@ -0,0 +1,99 @@
+import numpy as np
+
+from diamond_features import depth_ratio, price_matrix, recommend_matrix
+
+# Sweepable inputs and their default ranges, in the order the models take them.
+FEATURES = {"carat": (0.0, 10.0), "length": (0.0, 40.0), "width": (0.0, 40.0), "depth": (0.0, 40.0)}
+POINTS = {1: 400, 2: 100}
+
+
+def sweep(linear_mod, logistic_mod, base, ranges, points, asking_price=None, ratio_scale=100, ratio_decimals=1,
+          absolute=True):
+    """Score every combination of the swept features in one batched call per model.
+
+    base holds the fixed value of every feature; ranges maps the one or two
+    swept features to (low, high). Prices are |prediction| with absolute=True,
+    as Poly_mod shows them, and signed otherwise, as Predictor does. The
+    recommendation is made at asking_price, or at that predicted price when
+    asking_price is None. Cells where the depth ratio is 0 are NaN, as the
+    apps refuse to score them.
+    """
+    axes = {name: np.linspace(low, high, points) for name, (low, high) in ranges.items()}
+    grids = dict(zip(axes, np.meshgrid(*axes.values(), indexing="ij")))
+    shape = next(iter(grids.values())).shape
+    carat, length, width, depth = (grids[f].ravel() if f in grids else np.full(np.prod(shape), float(base[f]))
+                                   for f in FEATURES)
+
+    ratio = depth_ratio(length, width, depth, scale=ratio_scale, decimals=ratio_decimals)
+    valid = ratio != 0
+    price = np.full(carat.size, np.nan)
+    buy = np.full(carat.size, np.nan)
+    if valid.any():
+        price[valid] = linear_mod.predict(price_matrix(carat, length, width, depth, ratio)[valid])
+        if absolute:
+            price = np.abs(price)
+        if logistic_mod is not None:
+            offer = price if asking_price is None else asking_price
+            X = recommend_matrix(offer, carat, length, width, depth, ratio)[valid]
+            buy[valid] = logistic_mod.predict_proba(X)[:, list(logistic_mod.classes_).index(1)]
+    return {"axes": axes, "price": price.reshape(shape), "buy": buy.reshape(shape), "evaluations": int(valid.sum())}
+
+
+def sweep_figure(result):
+    import plotly.graph_objects as go
+
+    names = list(result["axes"])
+    price, buy = result["price"], result["buy"]
+    fig = go.Figure()
+    if len(names) == 1:
+        x = result["axes"][names[0]]
+        fig.add_trace(go.Scatter(x=x, y=price, mode="lines", name="Predicted price", line_color="gray"))
+        fig.add_trace(go.Scatter(x=x, y=np.where(buy > 0.5, price, np.nan), mode="lines", name="BUY",
+                                 line=dict(color="limegreen", width=4)))
+        # Boundary: where the recommendation flips between neighbouring points.
+        flips = np.flatnonzero(np.diff((buy > 0.5).astype(int)) != 0)
+        for i in flips:
+            fig.add_vline(x=(x[i] + x[i + 1]) / 2, line_dash="dash", line_color="limegreen")
+        fig.update_layout(xaxis_title=names[0], yaxis_title="Predicted price")
+    else:
+        x, y = (result["axes"][n] for n in names)
+        # Arrays are indexed [x, y]; plotly wants rows to be y.
+        fig.add_trace(go.Contour(x=x, y=y, z=price.T, colorscale="Viridis", name="Predicted price",
+                                 colorbar=dict(title="Price"),
+                                 hovertemplate=f"{names[0]}=%{{x}}<br>{names[1]}=%{{y}}<br>price=%{{z:.0f}}<extra></extra>"))
+        if not np.isnan(buy).all():
+            fig.add_trace(go.Contour(x=x, y=y, z=buy.T, name="Buy boundary", showscale=False, hoverinfo="skip",
+                                     contours=dict(start=0.5, end=0.5, size=1, coloring="lines"),
+                                     line=dict(color="white", width=3, dash="dash")))
+        fig.update_layout(xaxis_title=names[0], yaxis_title=names[1])
+    fig.update_layout(height=500, margin=dict(l=0, r=0, t=30, b=0))
+    return fig
+
+
+def sweep_section(linear_mod, logistic_mod, base, key="sweep", **kwargs):
+    import streamlit as st
+
+    if not st.toggle("What-if Sweep", key=key):
+        return
+
+    vary = st.multiselect("Features to vary", list(FEATURES), default=["carat"], max_selections=2,
+                          key=f"{key}_features")
+    if not vary:
+        st.info("Pick one or two features to vary.")
+        return
+    ranges = {name: st.slider(f"{name.capitalize()} range", *FEATURES[name], value=FEATURES[name],
+                              key=f"{key}_{name}_range")
+              for name in vary}
+    points = st.slider("Points per feature", 10, 1000, POINTS[len(vary)], key=f"{key}_points_{len(vary)}")
+    asking = st.number_input("Asking price for the recommendation (0 uses the predicted price)", min_value=0.0,
+                             key=f"{key}_price")
+
+    result = sweep(linear_mod, logistic_mod, base, ranges, points, asking or None, **kwargs)
+    if result["evaluations"] == 0:
+        st.warning("Every input in this sweep has a zero depth ratio; set a non-zero depth, length or width.")
+        return
+    from figure_payload import plotly_chart
+
+    plotly_chart(sweep_figure(result), key=f"{key}_chart")
+    st.caption(f"{result['evaluations']:,} inputs scored in one batch; other features fixed at "
+               + ", ".join(f"{f}={base[f]}" for f in FEATURES if f not in vary) + ".")